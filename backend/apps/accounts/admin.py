@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Follow
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ["user", "kind", "target_id", "created_at"]
+    list_filter = ["kind"]
+    raw_id_fields = ["user"]
@@ -0,0 +1,196 @@
+"""
+"For You" feed: fan-out on publish, with merge-on-read for heavy followers.
+
+On publish, the new article id is pushed onto the FeedInbox of every user
+following its section, one of its tags or its author. Reading a feed is then
+one inbox row plus one query to hydrate the page of cards.
+
+Users following more than FEED_FANOUT_MAX_FOLLOWS things would make every
+publish touch their inbox, so the fan-out skips them; their feed is merged
+at read time from the follow list instead (`merged_articles()`).
+
+The fan-out itself is a django_tasks task, so it runs wherever the TASKS
+setting sends it: inline with the default immediate backend, or on a worker
+with a queue-backed one.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from django_tasks import task
+from wagtail.models import Page
+
+from apps.content.models import ArticlePage
+
+from .models import Follow, FeedInbox
+
+FEED_INBOX_CAP = getattr(settings, "FEED_INBOX_CAP", 500)
+FEED_FANOUT_MAX_FOLLOWS = getattr(settings, "FEED_FANOUT_MAX_FOLLOWS", 200)
+FANOUT_CHUNK_SIZE = 1000
+
+
+def follower_ids(article: ArticlePage) -> List[int]:
+    """
+    Users following the article's section, any of its tags, or its author.
+    """
+    query = Q(kind=Follow.SECTION, target_id=article.section_page.id)
+
+    tag_ids = [t.id for t in article.tags.all()]
+    if tag_ids:
+        query |= Q(kind=Follow.TAG, target_id__in=tag_ids)
+    if article.owner_id:
+        query |= Q(kind=Follow.AUTHOR, target_id=article.owner_id)
+
+    return list(Follow.objects.filter(query).values_list("user_id", flat=True).distinct())
+
+
+def fan_out(article_id: int, user_ids: Optional[List[int]] = None) -> int:
+    """
+    Push a published article onto its followers' inboxes. Returns how many inboxes changed.
+    """
+    article = ArticlePage.objects.live().public().filter(pk=article_id).first()
+    if not article:
+        return 0
+
+    if user_ids is None:
+        user_ids = follower_ids(article)
+    changed_total = 0
+
+    for start in range(0, len(user_ids), FANOUT_CHUNK_SIZE):
+        chunk = user_ids[start:start + FANOUT_CHUNK_SIZE]
+        with transaction.atomic():
+            inboxes = FeedInbox.objects.select_for_update().filter(
+                user_id__in=chunk, follow_count__lte=FEED_FANOUT_MAX_FOLLOWS
+            )
+            now = timezone.now()
+            changed = []
+            for inbox in inboxes:
+                # republishing an article must not bump it to the top again
+                if inbox.push(article.id, FEED_INBOX_CAP):
+                    inbox.updated_at = now
+                    changed.append(inbox)
+            FeedInbox.objects.bulk_update(changed, ["article_ids", "updated_at"])
+        changed_total += len(changed)
+
+    return changed_total
+
+
+@task()
+def fan_out_task(article_id: int) -> int:
+    return fan_out(article_id)
+
+
+def schedule_fan_out(article: ArticlePage) -> None:
+    """
+    Called after the publish commits. Only the article id is queued; the
+    followers are looked up when the task runs, so they are current then.
+    """
+    fan_out_task.enqueue(article.id)
+
+
+def merged_articles(user):
+    """
+    Followed articles, merged at read time from the follow list.
+    """
+    follows = list(user.follows.values_list("kind", "target_id"))
+    section_ids = [t for kind, t in follows if kind == Follow.SECTION]
+    tag_ids = [t for kind, t in follows if kind == Follow.TAG]
+    author_ids = [t for kind, t in follows if kind == Follow.AUTHOR]
+
+    query = Q(pk__in=[])
+    for path in Page.objects.filter(pk__in=section_ids).values_list("path", flat=True):
+        query |= Q(path__startswith=path)
+    if tag_ids:
+        query |= Q(tagged_items__tag_id__in=tag_ids)
+    if author_ids:
+        query |= Q(owner_id__in=author_ids)
+
+    return (
+        ArticlePage.objects.live()
+        .public()
+        .filter(query)
+        .distinct()
+        .order_by("-first_published_at", "-pk")
+    )
+
+
+def rebuild_inbox(user) -> FeedInbox:
+    """
+    Recompute a user's inbox from scratch (after they follow/unfollow something).
+    """
+    inbox, _ = FeedInbox.objects.get_or_create(user=user)
+    if inbox.follow_count > FEED_FANOUT_MAX_FOLLOWS:
+        inbox.set_ids([])
+    else:
+        inbox.set_ids(merged_articles(user).values_list("pk", flat=True)[:FEED_INBOX_CAP])
+    inbox.save(update_fields=["article_ids", "updated_at"])
+    return inbox
+
+
+def _older_than(qs, before: int):
+    """
+    `qs` (ordered newest first) narrowed to what comes after article `before`, or None if that article is gone.
+    """
+    anchor = ArticlePage.objects.filter(pk=before).values("first_published_at").first()
+    if anchor is None:
+        return None
+    return qs.filter(
+        Q(first_published_at__lt=anchor["first_published_at"])
+        | Q(first_published_at=anchor["first_published_at"], pk__lt=before)
+    )
+
+
+def read_feed(user, before: Optional[int] = None, limit: int = 20) -> Tuple[List[ArticlePage], Optional[int]]:
+    """
+    A page of the user's feed, newest first, and the cursor for the next page.
+    `before` is the id of the last article of the previous page.
+    """
+    inbox = FeedInbox.objects.filter(user=user).first()
+    if inbox is None:
+        return [], None
+
+    if inbox.follow_count > FEED_FANOUT_MAX_FOLLOWS:
+        qs = merged_articles(user).select_related("hero_image")
+        if before is not None:
+            qs = _older_than(qs, before)
+            if qs is None:
+                # never restart at the top: the client would loop
+                return [], None
+        articles = list(qs[: limit + 1])
+        has_more = len(articles) > limit
+        articles = articles[:limit]
+        return articles, (articles[-1].pk if has_more and articles else None)
+
+    ids = inbox.get_ids()
+    if before is None:
+        start = 0
+    elif before in ids:
+        start = ids.index(before) + 1
+    else:
+        # The cursor left the inbox (trimmed to FEED_INBOX_CAP, or a rebuild
+        # after an unfollow): carry on from its publish date instead.
+        older = _older_than(ArticlePage.objects.filter(pk__in=ids), before)
+        if older is None:
+            return [], None
+        remaining = set(older.values_list("pk", flat=True))
+        ids = [pk for pk in ids if pk in remaining]
+        start = 0
+    window = ids[start:start + limit]
+
+    by_id = ArticlePage.objects.live().public().select_related("hero_image").in_bulk(window)
+    # unpublished articles simply drop out
+    articles = [by_id[pk] for pk in window if pk in by_id]
+    next_cursor = window[-1] if start + limit < len(ids) else None
+    return articles, next_cursor
+
+
+def adjust_follow_count(user_id: int, delta: int) -> None:
+    FeedInbox.objects.get_or_create(user_id=user_id)
+    FeedInbox.objects.filter(user_id=user_id).update(follow_count=Greatest(F("follow_count") + delta, 0))
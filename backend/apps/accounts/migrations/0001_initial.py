@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedInbox',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_inbox', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('article_ids', models.BinaryField(default=bytes)),
+                ('follow_count', models.PositiveIntegerField(db_index=True, default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Follow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('section', 'Section'), ('tag', 'Tag'), ('author', 'Author')], max_length=10)),
+                ('target_id', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='follows', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'target_id'], name='follow_target_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'target_id'), name='unique_follow')],
+            },
+        ),
+    ]
@@ -1,3 +1,79 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, List
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class Follow(models.Model):
+    """
+    A reader following a section, a tag or an author.
+    `target_id` is the SectionPage id, taggit Tag id or User id.
+    """
+    SECTION = "section"
+    TAG = "tag"
+    AUTHOR = "author"
+    KIND_CHOICES = [
+        (SECTION, "Section"),
+        (TAG, "Tag"),
+        (AUTHOR, "Author"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="follows")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    target_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "kind", "target_id"], name="unique_follow"),
+        ]
+        indexes = [
+            # fan-out: "who follows this section/tag/author?"
+            models.Index(fields=["kind", "target_id"], name="follow_target_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.kind}:{self.target_id}"
+
+
+class FeedInbox(models.Model):
+    """
+    Precomputed "For You" feed: the newest article ids from everything the
+    user follows, newest first, packed as 64-bit ints and capped at
+    FEED_INBOX_CAP entries. Filled on publish (apps/accounts/feed.py), so
+    reading a feed is one row fetch.
+
+    Readers following more than FEED_FANOUT_MAX_FOLLOWS things are skipped
+    by the fan-out and merged on read instead; `follow_count` is kept up to
+    date so the fan-out can tell them apart without counting.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="feed_inbox"
+    )
+    article_ids = models.BinaryField(default=bytes)
+    follow_count = models.PositiveIntegerField(default=0, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Inbox of {self.user_id}"
+
+    def get_ids(self) -> List[int]:
+        ids = array("q")
+        ids.frombytes(bytes(self.article_ids))
+        return ids.tolist()
+
+    def set_ids(self, ids: Iterable[int]) -> None:
+        self.article_ids = array("q", ids).tobytes()
+
+    def push(self, article_id: int, cap: int) -> bool:
+        """
+        Put `article_id` at the front, trimming to `cap`. Returns False if it was already there.
+        """
+        ids = self.get_ids()
+        if article_id in ids:
+            return False
+        self.set_ids([article_id] + ids[: cap - 1])
+        return True
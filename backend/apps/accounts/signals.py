@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.signals import page_published
+
+from apps.content.models import ArticlePage
+
+from .feed import adjust_follow_count, schedule_fan_out
+from .models import Follow
+
+
+@receiver(page_published)
+def fan_out_published_article(sender, instance, **kwargs):
+    page = instance.specific
+    if isinstance(page, ArticlePage):
+        transaction.on_commit(lambda: schedule_fan_out(page))
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, **kwargs):
+    if created:
+        adjust_follow_count(instance.user_id, +1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_removed_follow(sender, instance, **kwargs):
+    adjust_follow_count(instance.user_id, -1)
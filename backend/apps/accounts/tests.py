@@ -1,3 +1,144 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from django_tasks import default_task_backend
+
+from apps.content.fixtures import build_site
+from apps.content.models import ArticlePage
+
+from . import feed
+from .models import Follow, FeedInbox
+
+
+class ForYouFeedTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.reader = User.objects.create_user("reader", password="pw")
+        self.author = User.objects.create_user("author", password="pw")
+
+        _, [self.politics, self.sports] = build_site("politics", "sports")
+
+        self.client.force_login(self.reader)
+
+    def publish(self, section, slug, tags=(), owner=None):
+        article = ArticlePage(title=slug, slug=slug, owner=owner, live=False)
+        section.add_child(instance=article)
+        article.tags.add(*tags)
+        with self.captureOnCommitCallbacks(execute=True):
+            article.save_revision().publish()
+        return article
+
+    def follow(self, kind, target_id):
+        return self.client.post(reverse("me-follows"), {"kind": kind, "target_id": target_id})
+
+    def feed_slugs(self, **params):
+        return [c["slug"] for c in self.client.get(reverse("me-feed"), params).json()["results"]]
+
+    def test_publish_fans_out_to_followers(self):
+        self.follow("section", self.politics.id)
+        self.follow("author", self.author.id)
+
+        self.publish(self.politics, "budget")
+        self.publish(self.sports, "cricket")
+        self.publish(self.sports, "marathon", owner=self.author)
+
+        self.assertEqual(self.feed_slugs(), ["marathon", "budget"])
+
+    @override_settings(TASKS={"default": {"BACKEND": "django_tasks.backends.dummy.DummyBackend"}})
+    def test_fan_out_is_queued_as_a_task(self):
+        self.follow("section", self.politics.id)
+        article = self.publish(self.politics, "budget")
+
+        # nothing written on the publishing request
+        [result] = [r for r in default_task_backend.results if r.task.func is feed.fan_out_task.func]
+        self.assertEqual(list(result.args), [article.id])
+        self.assertEqual(self.feed_slugs(), [])
+
+        self.assertEqual(result.task.call(*result.args), 1)
+        self.assertEqual(self.feed_slugs(), ["budget"])
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        self.publish(self.politics, "budget")
+        self.publish(self.sports, "cricket", tags=["cricket"])
+
+        self.follow("section", self.politics.id)
+        self.assertEqual(self.feed_slugs(), ["budget"])
+
+        tag_id = ArticlePage.objects.get(slug="cricket").tags.get().id
+        self.follow("tag", tag_id)
+        self.assertEqual(self.feed_slugs(), ["cricket", "budget"])
+
+        self.client.delete(reverse("me-follow-detail", args=["section", self.politics.id]))
+        self.assertEqual(self.feed_slugs(), ["cricket"])
+
+    def test_inbox_is_capped_and_read_in_constant_queries(self):
+        self.follow("section", self.politics.id)
+        with mock.patch.object(feed, "FEED_INBOX_CAP", 3):
+            for i in range(5):
+                self.publish(self.politics, f"story-{i}")
+
+        inbox = FeedInbox.objects.get(user=self.reader)
+        self.assertEqual(len(inbox.get_ids()), 3)
+
+        # session, user, inbox, view restrictions, articles, section slugs
+        with self.assertNumQueries(6):
+            self.assertEqual(self.feed_slugs(), ["story-4", "story-3", "story-2"])
+
+    def test_pagination(self):
+        self.follow("section", self.politics.id)
+        for i in range(3):
+            self.publish(self.politics, f"story-{i}")
+
+        articles, cursor = feed.read_feed(self.reader, limit=2)
+        self.assertEqual([a.slug for a in articles], ["story-2", "story-1"])
+        articles, cursor = feed.read_feed(self.reader, before=cursor, limit=2)
+        self.assertEqual([a.slug for a in articles], ["story-0"])
+        self.assertIsNone(cursor)
+
+    def test_cursor_that_left_the_inbox(self):
+        self.follow("section", self.politics.id)
+        for i in range(4):
+            self.publish(self.politics, f"story-{i}")
+        articles, cursor = feed.read_feed(self.reader, limit=2)
+
+        # the cursor drops out of the inbox mid-pagination (trimmed, or rebuilt)
+        inbox = FeedInbox.objects.get(user=self.reader)
+        inbox.set_ids([pk for pk in inbox.get_ids() if pk != cursor])
+        inbox.save()
+        articles, cursor = feed.read_feed(self.reader, before=cursor, limit=2)
+        self.assertEqual([a.slug for a in articles], ["story-1", "story-0"])
+        self.assertIsNone(cursor)
+
+        # a cursor for an article that no longer exists ends the feed
+        self.assertEqual(feed.read_feed(self.reader, before=10 ** 9), ([], None))
+        FeedInbox.objects.filter(user=self.reader).update(follow_count=feed.FEED_FANOUT_MAX_FOLLOWS + 1)
+        self.assertEqual(feed.read_feed(self.reader, before=10 ** 9), ([], None))
+
+    def test_heavy_followers_merge_on_read(self):
+        self.follow("section", self.politics.id)
+        self.follow("section", self.sports.id)
+        FeedInbox.objects.filter(user=self.reader).update(follow_count=feed.FEED_FANOUT_MAX_FOLLOWS + 1)
+
+        self.publish(self.politics, "budget")
+        self.publish(self.sports, "cricket")
+
+        # skipped by the fan-out...
+        self.assertEqual(FeedInbox.objects.get(user=self.reader).get_ids(), [])
+        # ...but still served
+        self.assertEqual(self.feed_slugs(), ["cricket", "budget"])
+
+    def test_follow_count_is_maintained(self):
+        self.follow("section", self.politics.id)
+        self.follow("section", self.sports.id)
+        self.follow("section", self.sports.id)
+        self.assertEqual(FeedInbox.objects.get(user=self.reader).follow_count, 2)
+
+        Follow.objects.filter(user=self.reader, target_id=self.sports.id).delete()
+        self.assertEqual(FeedInbox.objects.get(user=self.reader).follow_count, 1)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("me-feed")).status_code, 403)
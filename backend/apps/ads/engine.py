@@ -0,0 +1,326 @@
+"""
+In-memory ad decisions.
+
+Each worker keeps every running campaign in an inverted index: one dict per
+targeting dimension (slot, section, tag) mapping a value to the campaigns
+that target it, plus the set of campaigns that don't restrict that
+dimension. A decision is a few set lookups and intersections, then a weighted
+pick among the survivors; the database is not touched.
+
+The index is rebuilt (four queries) when a version key in the cache moves,
+which any committed change to campaigns, creatives or targeting bumps
+(apps/ads/signals.py); workers look at the key at most once per
+INDEX_CHECK_INTERVAL. Flight windows are checked at decision time, so a
+campaign starting at midnight needs no reload.
+
+Counters:
+
+  - frequency caps count impressions per (reader, campaign) per day in this
+    worker. With several workers a reader can see a capped campaign up to
+    cap x workers times; sticky load balancing tightens that.
+  - pacing keeps a campaign's daily goal spread over the day. Workers count
+    locally and add their counts to a shared cache counter every
+    PACING_SYNC_INTERVAL seconds, reading back the total served everywhere.
+
+Every decision counts as an impression.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Campaign
+
+
+VERSION_KEY = "ads:version"
+
+PACING_SYNC_INTERVAL = getattr(settings, "ADS_PACING_SYNC_INTERVAL", 5.0)
+# how far ahead of the even-delivery line a campaign may run
+PACING_SLACK = getattr(settings, "ADS_PACING_SLACK", 0.02)
+FREQUENCY_MAX_READERS = getattr(settings, "ADS_FREQUENCY_MAX_READERS", 100_000)
+# how often a worker looks at the version key; edits go live within this
+INDEX_CHECK_INTERVAL = getattr(settings, "ADS_INDEX_CHECK_INTERVAL", 1.0)
+
+TIERS = (Campaign.DIRECT, Campaign.HOUSE)
+
+
+@dataclass
+class CampaignEntry:
+    id: int
+    kind: str
+    weight: int
+    starts_at: Optional[datetime]
+    ends_at: Optional[datetime]
+    frequency_cap: Optional[int]
+    daily_impressions: Optional[int]
+    # variant -> creatives; "" holds the ones that fit any slot
+    creatives: Dict[str, List[dict]] = field(default_factory=dict)
+
+    def creatives_for(self, variant: str) -> List[dict]:
+        if variant:
+            return self.creatives.get(variant, []) + self.creatives.get("", [])
+        return [c for group in self.creatives.values() for c in group]
+
+
+class _Dimension:
+    def __init__(self):
+        self.by_value: Dict[str, Set[int]] = {}
+        self.anywhere: Set[int] = set()
+
+    def add(self, campaign_id: int, values: Iterable[str]) -> None:
+        values = list(values)
+        if not values:
+            self.anywhere.add(campaign_id)
+        for value in values:
+            self.by_value.setdefault(value, set()).add(campaign_id)
+
+    def match(self, values: Iterable[str]) -> Set[int]:
+        matched = set(self.anywhere)
+        for value in values:
+            matched |= self.by_value.get(value, set())
+        return matched
+
+
+class AdIndex:
+    def __init__(self, campaigns: Iterable[Tuple[CampaignEntry, List[str], List[str], List[str]]] = ()):
+        self.campaigns: Dict[int, CampaignEntry] = {}
+        self.slots = _Dimension()
+        self.sections = _Dimension()
+        self.tags = _Dimension()
+        for entry, slots, sections, tags in campaigns:
+            self.campaigns[entry.id] = entry
+            self.slots.add(entry.id, slots)
+            self.sections.add(entry.id, sections)
+            self.tags.add(entry.id, tags)
+
+    def page_candidates(self, section: str, tags: Iterable[str]) -> Set[int]:
+        """
+        Campaigns whose section and tag targeting fit the page; the same for every slot on it.
+        """
+        found = self.sections.match([section] if section else [])
+        if found:
+            found &= self.tags.match(tags)
+        return found
+
+    def candidates(self, slot: str, page: Set[int]) -> Set[int]:
+        return page & (self.slots.by_value.get(slot, set()) | self.slots.anywhere)
+
+
+def load_index() -> AdIndex:
+    now = timezone.now()
+    campaigns = (
+        Campaign.objects.filter(active=True)
+        .exclude(ends_at__lt=now)
+        .prefetch_related("creatives__image", "sections", "tags")
+    )
+
+    rows = []
+    for campaign in campaigns:
+        entry = CampaignEntry(
+            id=campaign.id,
+            kind=campaign.kind,
+            weight=max(campaign.weight, 1),
+            starts_at=campaign.starts_at,
+            ends_at=campaign.ends_at,
+            frequency_cap=campaign.frequency_cap,
+            daily_impressions=campaign.daily_impressions,
+        )
+        for creative in campaign.creatives.all():
+            entry.creatives.setdefault(creative.variant, []).append({
+                "id": f"ad-{creative.id}",
+                "title": creative.title,
+                "subtitle": creative.subtitle,
+                "image_url": creative.image.file.url if creative.image else creative.image_url,
+                "href": creative.href,
+                "badge": creative.badge,
+            })
+        if not entry.creatives:
+            continue
+
+        rows.append((
+            entry,
+            campaign.slot_list(),
+            [s.slug for s in campaign.sections.all()],
+            [t.slug for t in campaign.tags.all()],
+        ))
+    return AdIndex(rows)
+
+
+def _version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def bump_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+class _Counters:
+    """
+    This worker's frequency and pacing counts for the current day.
+    """
+    def __init__(self):
+        self.day: Optional[date] = None
+        self.frequency: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+        self.pending: Dict[int, int] = {}  # served here, not yet added to the cache
+        self.served: Dict[int, int] = {}  # everywhere, as of the last sync
+        self.synced_at = float("-inf")
+
+    def roll_over(self, today: date) -> None:
+        if today != self.day:
+            self.day = today
+            self.frequency.clear()
+            self.pending.clear()
+            self.served.clear()
+            self.synced_at = float("-inf")
+
+    def seen(self, reader: str, campaign_id: int) -> int:
+        return self.frequency.get((reader, campaign_id), 0)
+
+    def record(self, reader: str, campaign_id: int) -> None:
+        if reader:
+            key = (reader, campaign_id)
+            self.frequency[key] = self.frequency.get(key, 0) + 1
+            self.frequency.move_to_end(key)
+            while len(self.frequency) > FREQUENCY_MAX_READERS:
+                self.frequency.popitem(last=False)
+        self.pending[campaign_id] = self.pending.get(campaign_id, 0) + 1
+
+    def delivered(self, campaign_id: int) -> int:
+        return self.served.get(campaign_id, 0) + self.pending.get(campaign_id, 0)
+
+
+def _pacing_key(campaign_id: int, day: date) -> str:
+    return f"ads:served:{day.isoformat()}:{campaign_id}"
+
+
+class DecisionEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = AdIndex()
+        self._version: Optional[int] = None
+        self._checked_at = float("-inf")
+        self._counters = _Counters()
+        self._random = random.Random()
+
+    def index(self) -> AdIndex:
+        if time.monotonic() - self._checked_at < INDEX_CHECK_INTERVAL:
+            return self._index
+        self._checked_at = time.monotonic()
+
+        version = _version()
+        if version != self._version:
+            index = load_index()
+            with self._lock:
+                self._index, self._version = index, version
+        return self._index
+
+    def decide(self, slots: List[Tuple[str, str]], section: str = "", tags: Iterable[str] = (),
+               reader: str = "") -> List[Optional[dict]]:
+        """
+        One creative (or None) for each (slot, variant), filling a whole page
+        at once: the same campaign is not repeated while others are eligible.
+        """
+        index = self.index()
+        tags = list(tags)
+        now = timezone.now()
+        self._sync_pacing(now, index)
+
+        page = index.page_candidates(section, tags)
+        results: List[Optional[dict]] = []
+        with self._lock:
+            used: Set[int] = set()
+            for slot, variant in slots:
+                eligible = [
+                    index.campaigns[pk] for pk in index.candidates(slot, page)
+                    if self._eligible(index.campaigns[pk], variant, reader, now)
+                ]
+                fresh = [c for c in eligible if c.id not in used]
+                campaign = self._pick(fresh or eligible)
+                if campaign is None:
+                    results.append(None)
+                    continue
+
+                used.add(campaign.id)
+                self._counters.record(reader, campaign.id)
+                results.append(self._random.choice(campaign.creatives_for(variant)))
+        return results
+
+    def _eligible(self, campaign: CampaignEntry, variant: str, reader: str, now: datetime) -> bool:
+        if campaign.starts_at and campaign.starts_at > now:
+            return False
+        if campaign.ends_at and campaign.ends_at <= now:
+            return False
+        if not campaign.creatives_for(variant):
+            return False
+        if reader and campaign.frequency_cap is not None:
+            if self._counters.seen(reader, campaign.id) >= campaign.frequency_cap:
+                return False
+        if campaign.daily_impressions:
+            return self._counters.delivered(campaign.id) < self._pacing_allowance(campaign, now)
+        return True
+
+    def _pacing_allowance(self, campaign: CampaignEntry, now: datetime) -> float:
+        local = timezone.localtime(now)
+        elapsed = (local.hour * 3600 + local.minute * 60 + local.second) / 86400
+        goal = campaign.daily_impressions
+        return min(goal, goal * (elapsed + PACING_SLACK) + 1)
+
+    def _pick(self, campaigns: List[CampaignEntry]) -> Optional[CampaignEntry]:
+        for tier in TIERS:
+            tiered = [c for c in campaigns if c.kind == tier]
+            if tiered:
+                return self._random.choices(tiered, weights=[c.weight for c in tiered])[0]
+        return None
+
+    def _sync_pacing(self, now: datetime, index: AdIndex) -> None:
+        counters = self._counters
+        today = timezone.localdate(now)
+        with self._lock:
+            counters.roll_over(today)
+            if time.monotonic() - counters.synced_at < PACING_SYNC_INTERVAL:
+                return
+            counters.synced_at = time.monotonic()
+            pending, counters.pending = counters.pending, {}
+
+        # Outside the lock: this is the only cache traffic, once per interval.
+        for campaign_id, count in pending.items():
+            key = _pacing_key(campaign_id, today)
+            cache.add(key, 0, 2 * 86400)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                cache.set(key, count, 2 * 86400)
+
+        paced = [c.id for c in index.campaigns.values() if c.daily_impressions]
+        totals = cache.get_many([_pacing_key(pk, today) for pk in paced])
+        with self._lock:
+            counters.served = {pk: totals.get(_pacing_key(pk, today), 0) for pk in paced}
+
+
+_engine = DecisionEngine()
+
+
+def get_engine() -> DecisionEngine:
+    return _engine
+
+
+def reset_engine() -> None:
+    global _engine
+    _engine = DecisionEngine()
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:45
+
+import django.db.models.deletion
+import modelcluster.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('content', '0003_articlepage_topics'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        ('wagtailimages', '0027_image_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Campaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('kind', models.CharField(choices=[('direct', 'Direct-sold'), ('house', 'House ad')], default='direct', max_length=10)),
+                ('active', models.BooleanField(default=True)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('starts_at', models.DateTimeField(blank=True, null=True)),
+                ('ends_at', models.DateTimeField(blank=True, null=True)),
+                ('slots', models.CharField(blank=True, help_text='Comma-separated slot names, e.g. home-banner, article-sidebar. Leave empty for every slot.', max_length=255)),
+                ('frequency_cap', models.PositiveIntegerField(blank=True, help_text='Most impressions per reader per day.', null=True)),
+                ('daily_impressions', models.PositiveIntegerField(blank=True, help_text='Daily goal; delivery is spread evenly over the day.', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('sections', modelcluster.fields.ParentalManyToManyField(blank=True, related_name='+', to='content.sectionpage')),
+                ('tags', modelcluster.fields.ParentalManyToManyField(blank=True, related_name='+', to='taggit.tag')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Creative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sort_order', models.IntegerField(blank=True, editable=False, null=True)),
+                ('title', models.CharField(max_length=120)),
+                ('subtitle', models.CharField(blank=True, max_length=200)),
+                ('image_url', models.URLField(blank=True, help_text='Used when no image is chosen.')),
+                ('href', models.URLField()),
+                ('badge', models.CharField(default='Sponsored', max_length=30)),
+                ('variant', models.CharField(blank=True, choices=[('', 'Any'), ('banner', 'Banner'), ('card', 'Card')], default='', max_length=10)),
+                ('campaign', modelcluster.fields.ParentalKey(on_delete=django.db.models.deletion.CASCADE, related_name='creatives', to='ads.campaign')),
+                ('image', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='wagtailimages.image')),
+            ],
+            options={
+                'ordering': ['sort_order'],
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import List
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+from wagtail.admin.panels import FieldPanel, FieldRowPanel, InlinePanel, MultiFieldPanel
+from wagtail.models import Orderable
+
+from modelcluster.fields import ParentalKey, ParentalManyToManyField
+from modelcluster.models import ClusterableModel
+
+
+# Where AdSlot components sit on the Next.js pages
+SLOT_CHOICES = [
+    ("home-banner", "Home: banner"),
+    ("home-sidebar", "Home: sidebar"),
+    ("section-banner", "Section: banner"),
+    ("section-sidebar", "Section: sidebar"),
+    ("article-banner", "Article: banner"),
+    ("article-sidebar", "Article: sidebar"),
+]
+SLOTS = {value for value, _ in SLOT_CHOICES}
+
+
+class Campaign(ClusterableModel):
+    """
+    A set of creatives with targeting, a flight window, a per-reader
+    frequency cap and an optional daily impression goal. Served by the
+    in-memory decision engine in apps/ads/engine.py.
+
+    Direct-sold campaigns always win over house ads when both are eligible;
+    within a tier, campaigns are picked at random in proportion to `weight`.
+    Empty targeting (no sections, tags or slots) means "everywhere".
+    """
+    DIRECT = "direct"
+    HOUSE = "house"
+    KIND_CHOICES = [
+        (DIRECT, "Direct-sold"),
+        (HOUSE, "House ad"),
+    ]
+
+    name = models.CharField(max_length=120)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=DIRECT)
+    active = models.BooleanField(default=True)
+    weight = models.PositiveIntegerField(default=1)
+
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
+
+    slots = models.CharField(
+        max_length=255, blank=True,
+        help_text="Comma-separated slot names, e.g. home-banner, article-sidebar. Leave empty for every slot.",
+    )
+    sections = ParentalManyToManyField("content.SectionPage", blank=True, related_name="+")
+    tags = ParentalManyToManyField("taggit.Tag", blank=True, related_name="+")
+
+    frequency_cap = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Most impressions per reader per day."
+    )
+    daily_impressions = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Daily goal; delivery is spread evenly over the day."
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    panels = [
+        FieldPanel("name"),
+        FieldRowPanel([FieldPanel("kind"), FieldPanel("weight"), FieldPanel("active")]),
+        FieldRowPanel([FieldPanel("starts_at"), FieldPanel("ends_at")], heading="Flight"),
+        MultiFieldPanel([
+            FieldPanel("slots"),
+            FieldPanel("sections"),
+            FieldPanel("tags"),
+        ], heading="Targeting"),
+        FieldRowPanel([FieldPanel("frequency_cap"), FieldPanel("daily_impressions")], heading="Delivery"),
+        InlinePanel("creatives", label="Creatives", min_num=1),
+    ]
+
+    def __str__(self):
+        return self.name
+
+    def slot_list(self) -> List[str]:
+        return [s.strip() for s in self.slots.split(",") if s.strip()]
+
+    def clean(self):
+        unknown = [s for s in self.slot_list() if s not in SLOTS]
+        if unknown:
+            raise ValidationError({"slots": f"Unknown slots: {', '.join(unknown)}."})
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({"ends_at": "Must be after the start."})
+
+
+class Creative(Orderable):
+    """
+    One ad; shaped like the frontend's DemoAd (lib/demoAds.ts) when served.
+    """
+    ANY = ""
+    BANNER = "banner"
+    CARD = "card"
+    VARIANT_CHOICES = [
+        (ANY, "Any"),
+        (BANNER, "Banner"),
+        (CARD, "Card"),
+    ]
+
+    campaign = ParentalKey(Campaign, on_delete=models.CASCADE, related_name="creatives")
+    title = models.CharField(max_length=120)
+    subtitle = models.CharField(max_length=200, blank=True)
+    image = models.ForeignKey(
+        "wagtailimages.Image", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    image_url = models.URLField(blank=True, help_text="Used when no image is chosen.")
+    href = models.URLField()
+    badge = models.CharField(max_length=30, default="Sponsored")
+    variant = models.CharField(max_length=10, choices=VARIANT_CHOICES, blank=True, default=ANY)
+
+    panels = [
+        FieldPanel("title"),
+        FieldPanel("subtitle"),
+        FieldRowPanel([FieldPanel("image"), FieldPanel("image_url")]),
+        FieldPanel("href"),
+        FieldRowPanel([FieldPanel("badge"), FieldPanel("variant")]),
+    ]
+
+    def __str__(self):
+        return self.title
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .engine import bump_version
+from .models import Campaign, Creative
+
+
+# Bumped after commit: a worker that reloads inside the admin's transaction
+# would read the old rows, record the new version and stay stale.
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_save, sender=Creative)
+def campaign_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(bump_version)
+
+
+@receiver(post_delete, sender=Campaign)
+@receiver(post_delete, sender=Creative)
+def campaign_deleted(sender, instance, **kwargs):
+    # also sent per row by queryset.delete(), e.g. the snippets bulk delete
+    transaction.on_commit(bump_version)
+
+
+@receiver(m2m_changed, sender=Campaign.sections.through)
+@receiver(m2m_changed, sender=Campaign.tags.through)
+def targeting_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(bump_version)
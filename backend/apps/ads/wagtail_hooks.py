@@ -0,0 +1,6 @@
+from wagtail.snippets.models import register_snippet
+
+from .models import Campaign
+
+
+register_snippet(Campaign)
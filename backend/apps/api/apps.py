@@ -1,5 +1,36 @@
 from django.apps import AppConfig
 
+from wagtail.images.apps import WagtailImagesAppConfig
+
+
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.api"
+    default = True
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+
+class LeanImagesConfig(WagtailImagesAppConfig):
+    """
+    wagtail.images for the API-only profile (config.settings_api).
+
+    The stock ready() also wires up admin choosers, revision comparison,
+    display classes and the Wagtail API routers, which pulls in most of
+    wagtail.admin at boot. API workers never render those, so only the parts
+    that keep Image rows correct are kept: the permission policy, the file
+    cleanup and rendition-cache signal handlers, and the reference index.
+    """
+    default = False
+
+    def ready(self):
+        from wagtail.images import get_image_model, get_permission_policy
+        from wagtail.images.signal_handlers import register_signal_handlers
+        from wagtail.models.reference_index import ReferenceIndex
+        from wagtail.permissions import register_permission_policy
+
+        Image = get_image_model()
+        register_permission_policy(Image, get_permission_policy())
+        register_signal_handlers()
+        ReferenceIndex.register_model(Image)
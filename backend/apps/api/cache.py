@@ -0,0 +1,190 @@
+"""
+Single-flight caching for hot API payloads.
+
+When a popular key expires (or is invalidated on publish) every worker that
+misses at the same moment would rebuild it. `get_or_build()` makes sure only
+one caller rebuilds a given key:
+
+  - inside a process, threads share a per-key lock
+  - across processes, a short-lived lock key is taken with `cache.add()`
+    (atomic on every Django cache backend)
+
+Callers that lose the race get the stale value if there is one, otherwise
+they wait for the winner to store the fresh value.
+
+Entries also expire "probabilistically early" (XFetch): the closer a value
+gets to its expiry and the slower it was to build, the more likely a reader
+is to refresh it ahead of time, so recomputation is spread out instead of
+all keys expiring together.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .hot import INVALIDATE, bus
+
+
+DEFAULT_TIMEOUT = getattr(settings, "API_CACHE_TIMEOUT", 60)
+
+# How long a value is kept (and served stale) after its logical expiry.
+STALE_GRACE = getattr(settings, "API_CACHE_STALE_GRACE", 30)
+
+# XFetch beta: > 1 favours earlier refreshes, < 1 later ones.
+EARLY_EXPIRY_BETA = getattr(settings, "API_CACHE_EARLY_EXPIRY_BETA", 1.0)
+
+LOCK_TIMEOUT = getattr(settings, "API_CACHE_LOCK_TIMEOUT", 10)
+WAIT_TIMEOUT = getattr(settings, "API_CACHE_WAIT_TIMEOUT", 5)
+POLL_INTERVAL = 0.05
+
+
+class CacheEntry(NamedTuple):
+    value: Any
+    delta: float  # seconds the last build took
+    expires_at: float  # logical expiry (unix time)
+
+
+def _lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+class _KeyLocks:
+    """
+    Ref-counted per-key locks so the dict does not grow with every slug ever requested.
+    """
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: Dict[str, List[Any]] = {}
+
+    def acquire(self, key: str, blocking: bool = True) -> bool:
+        with self._guard:
+            slot = self._locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+
+        acquired = slot[0].acquire(blocking)
+        if not acquired:
+            self._release_ref(key)
+        return acquired
+
+    def release(self, key: str) -> None:
+        with self._guard:
+            slot = self._locks[key]
+        slot[0].release()
+        self._release_ref(key)
+
+    def _release_ref(self, key: str) -> None:
+        with self._guard:
+            slot = self._locks.get(key)
+            if slot is None:
+                return
+            slot[1] -= 1
+            if slot[1] <= 0:
+                del self._locks[key]
+
+
+_key_locks = _KeyLocks()
+
+
+def _should_refresh(entry: CacheEntry, now: float, beta: float) -> bool:
+    # XFetch: now - delta * beta * ln(rand) >= expiry
+    # ln(rand) is negative, so the term pushes "now" forward by a random,
+    # build-time-proportional amount.
+    rnd = random.random() or 1e-12
+    return now - entry.delta * beta * math.log(rnd) >= entry.expires_at
+
+
+def _build_and_store(key: str, builder: Callable[[], Any], timeout: int) -> Any:
+    started = time.monotonic()
+    value = builder()
+    delta = time.monotonic() - started
+
+    entry = CacheEntry(value=value, delta=delta, expires_at=time.time() + timeout)
+    cache.set(key, entry, timeout + STALE_GRACE)
+    return value
+
+
+def _wait_for_value(key: str, deadline: float):
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_build(
+    key: str,
+    builder: Callable[[], Any],
+    timeout: int = DEFAULT_TIMEOUT,
+    beta: float = EARLY_EXPIRY_BETA,
+) -> Any:
+    """
+    Return the cached value for `key`, rebuilding it with `builder()` when needed.
+
+    Only one caller (across threads and processes sharing the cache) runs
+    `builder()` for a key at a time.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry, time.time(), beta):
+        return entry.value
+
+    # If there is something to serve, never block: whoever holds the lock is
+    # already refreshing it.
+    if not _key_locks.acquire(key, blocking=entry is None):
+        return entry.value
+
+    try:
+        # Another thread may have rebuilt it while we waited on the lock.
+        fresh = cache.get(key)
+        if fresh is not None and (entry is None or fresh.expires_at > entry.expires_at):
+            return fresh.value
+
+        token = uuid.uuid4().hex
+        if cache.add(_lock_key(key), token, LOCK_TIMEOUT):
+            try:
+                return _build_and_store(key, builder, timeout)
+            finally:
+                if cache.get(_lock_key(key)) == token:
+                    cache.delete(_lock_key(key))
+
+        # Another process is rebuilding.
+        if entry is not None:
+            return entry.value
+
+        waited = _wait_for_value(key, time.monotonic() + WAIT_TIMEOUT)
+        if waited is not None:
+            return waited.value
+
+        # The other worker is too slow (or died holding the lock): build anyway
+        # rather than failing the request.
+        return _build_and_store(key, builder, timeout)
+    finally:
+        _key_locks.release(key)
+
+
+def invalidate(*keys: str) -> None:
+    cache.delete_many(list(keys))
+    # and every worker's in-process copy (apps.api.hot)
+    bus.publish(INVALIDATE, keys)
+
+
+# Keys used by apps.api views
+def home_cache_key() -> str:
+    return "api:v1:home"
+
+
+def article_cache_key(slug: str) -> str:
+    return f"api:v1:article:{slug}"
+
+
+def section_cache_key(slug: str) -> str:
+    # first page of the feed only; later pages are keyed by cursor and not cached
+    return f"api:v1:section:{slug}"
@@ -0,0 +1,96 @@
+"""
+CDN cache headers for apps.api responses.
+
+Every cacheable response carries a `Surrogate-Key` header naming the entities
+it was built from. When one of those entities changes, only responses tagged
+with its key are purged at the CDN (see apps.api.purge), instead of flushing
+everything.
+
+Key names:
+  home                the home payload
+  section-<slug>      a section and its feed
+  article-<id>        one article (detail, and every feed card showing it)
+  tag-<slug>          anything listing articles with that tag
+  topic-<slug>        a topic feed (which includes its subtopics)
+  archive-<yyyy>-<mm> date archive feeds for that month
+  archive             the archive calendar
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+
+CDN_MAX_AGE = getattr(settings, "API_CDN_MAX_AGE", 30)
+CDN_S_MAXAGE = getattr(settings, "API_CDN_S_MAXAGE", 300)
+CDN_NOT_FOUND_MAX_AGE = getattr(settings, "API_CDN_NOT_FOUND_MAX_AGE", 10)
+
+
+def home_key() -> str:
+    return "home"
+
+
+def section_key(slug: str) -> str:
+    return f"section-{slug}"
+
+
+def article_key(article_id: int) -> str:
+    return f"article-{article_id}"
+
+
+def tag_key(slug: str) -> str:
+    return f"tag-{slug}"
+
+
+def topic_key(slug: str) -> str:
+    return f"topic-{slug}"
+
+
+def archive_key(year: Optional[int] = None, month: Optional[int] = None) -> str:
+    if year is None:
+        return "archive"
+    return f"archive-{year:04d}-{month:02d}"
+
+
+def article_keys(article) -> List[str]:
+    """
+    Keys to purge when an article changes.
+    """
+    keys = [article_key(article.id), home_key()]
+
+    section = getattr(article, "section_slug", "")
+    if section:
+        keys.append(section_key(section))
+
+    keys.extend(tag_key(t.slug) for t in article.tags.all())
+
+    if article.first_published_at:
+        day = timezone.localdate(article.first_published_at)
+        keys.extend([archive_key(day.year, day.month), archive_key()])
+
+    # the article also appears in every ancestor topic's feed
+    for topic in article.topics.all():
+        keys.extend(topic_key(crumb["slug"]) for crumb in topic.breadcrumbs())
+    return keys
+
+
+def _dedupe(keys: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(k for k in keys if k))
+
+
+def add_cdn_headers(response, keys: Iterable[str]):
+    """
+    Mark a response as cacheable by the CDN and tag it with surrogate keys.
+    Error responses only get a short TTL and no keys.
+    """
+    if response.status_code == 200:
+        response["Cache-Control"] = f"public, max-age={CDN_MAX_AGE}, s-maxage={CDN_S_MAXAGE}"
+        keys = _dedupe(keys)
+        if keys:
+            response["Surrogate-Key"] = " ".join(keys)
+    elif response.status_code == 404:
+        response["Cache-Control"] = f"public, max-age={CDN_NOT_FOUND_MAX_AGE}"
+    return response
@@ -0,0 +1,136 @@
+"""
+Per-worker tier in front of the shared API cache for the hottest articles.
+
+Article traffic is heavily skewed: a few dozen articles take most of the
+requests. Even a shared-cache hit costs a round trip and unpickling the
+payload, and then DRF renders it to JSON again. `hot_cache` keeps the
+already-rendered response bytes of the most recently used articles in
+process memory, so a hot hit is a dict lookup.
+
+Entries are dropped when apps.api.cache.invalidate() is called for their
+key: it publishes the keys on `bus`, and every HotCache subscribes to it.
+`LocalBus` only reaches the process it runs in; it has the same shape as a
+real broadcast channel (Redis pub/sub, Postgres LISTEN/NOTIFY) so one can
+be dropped in. Until then other workers notice a publish when their copy
+expires, after API_HOT_CACHE_TTL seconds at most.
+
+Stats are per worker: see HotCacheStatsAPIView.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+
+HOT_CACHE_SIZE = getattr(settings, "API_HOT_CACHE_SIZE", 256)
+HOT_CACHE_TTL = getattr(settings, "API_HOT_CACHE_TTL", 5)
+
+INVALIDATE = "api.cache.invalidate"
+
+
+class LocalBus:
+    """
+    In-process publish/subscribe.
+    """
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+
+    def subscribe(self, channel: str, callback: Callable[[Any], None]) -> None:
+        self._subscribers[channel].append(callback)
+
+    def publish(self, channel: str, message: Any) -> None:
+        for callback in list(self._subscribers[channel]):
+            callback(message)
+
+
+class HotEntry(NamedTuple):
+    body: bytes
+    keys: Tuple[str, ...]  # surrogate keys, see apps.api.cdn
+    expires_at: float  # time.monotonic()
+
+
+class HotCache:
+    """
+    A bounded LRU of rendered responses, safe to share between threads.
+    """
+    def __init__(self, size: int = HOT_CACHE_SIZE, ttl: float = HOT_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, HotEntry]" = OrderedDict()
+        # bumped by every discard, so a value read before an invalidation is
+        # not stored after it
+        self._generation = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key: str) -> Optional[HotEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self) -> int:
+        """
+        Take this before reading the value to put(); put() skips it if anything was invalidated since.
+        """
+        return self._generation
+
+    def put(self, key: str, body: bytes, keys: Iterable[str], generation: int) -> bool:
+        if self.size <= 0:
+            return False
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[key] = HotEntry(body, tuple(keys), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def discard(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "pid": os.getpid(),
+                "size": len(self._entries),
+                "capacity": self.size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hottest": list(reversed(self._entries))[:20],
+            }
+
+
+bus = LocalBus()
+hot_cache = HotCache()
+bus.subscribe(INVALIDATE, hot_cache.discard)
@@ -0,0 +1,40 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from apps.api.scheduler import LEAD_TIME, POLL_INTERVAL, Scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Publish scheduled pages and expire pages exactly on time, warming the API cache. "
+        "Run exactly one instance; a publish_scheduled cron job can stay on as a fallback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lead", type=float, default=LEAD_TIME,
+            help="Seconds before go-live to pre-build an article's payload.",
+        )
+        parser.add_argument(
+            "--poll", type=float, default=POLL_INTERVAL,
+            help="Longest sleep between checks for newly scheduled pages.",
+        )
+        parser.add_argument("--once", action="store_true", help="Handle whatever is due now and exit.")
+
+    def handle(self, *args, **opts):
+        scheduler = Scheduler(lead_time=opts["lead"], poll_interval=opts["poll"])
+
+        if opts["once"]:
+            scheduler.run_once()
+        else:
+            self._stop = threading.Event()
+            signal.signal(signal.SIGTERM, self._stopping)
+            signal.signal(signal.SIGINT, self._stopping)
+            scheduler.run_forever(self._stop)
+
+        self.stdout.write(f"published {scheduler.published}, expired {scheduler.expired}")
+
+    def _stopping(self, *args):
+        self._stop.set()
@@ -0,0 +1,143 @@
+"""
+Show what a worker spends its cold start on.
+
+    python manage.py startup_report
+    python manage.py startup_report --settings-module config.settings_api --top 30
+    python manage.py startup_report --compare config.settings config.settings_api
+
+Each profile is booted in a fresh interpreter with `python -X importtime`
+(django.setup() + loading the URLconf, i.e. what a WSGI worker does before
+its first request). Import time is grouped by top-level package, and the
+wall-clock boot time and peak RSS of the child are reported.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+BOOT_SNIPPET = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns; "
+    "from django.core.wsgi import get_wsgi_application; get_wsgi_application()"
+)
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+def _rss_mb(maxrss: int) -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return maxrss / divisor
+
+
+def boot(settings_module: str, importtime: bool = True) -> Tuple[float, float, str]:
+    """
+    Boot a worker for `settings_module` in a child process.
+    Returns (seconds, peak RSS in MB, -X importtime output).
+    """
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings_module}
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", BOOT_SNIPPET]
+
+    # Fork a tiny wrapper so RUSAGE_CHILDREN only covers this one boot.
+    wrapper = (
+        "import resource, subprocess, sys, time, json\n"
+        "t = time.perf_counter()\n"
+        "p = subprocess.run(sys.argv[1:], capture_output=True, text=True)\n"
+        "elapsed = time.perf_counter() - t\n"
+        "sys.stderr.write(p.stderr)\n"
+        "if p.returncode: sys.exit(p.returncode)\n"
+        "print(json.dumps([elapsed, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss]))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", wrapper, *cmd],
+        capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"{settings_module} failed to boot:\n{proc.stderr[-2000:]}")
+
+    elapsed, maxrss = json.loads(proc.stdout.strip().splitlines()[-1])
+    return elapsed, _rss_mb(maxrss), proc.stderr
+
+
+def group_by_package(importtime_output: str) -> List[Tuple[str, float, int]]:
+    """
+    Sum the *self* import time per top-level package.
+    Returns [(package, milliseconds, module count)] sorted by time.
+    """
+    totals: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+
+    for line in importtime_output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, _cumulative, _indent, module = match.groups()
+        package = module.split(".")[0]
+        # group project apps by app, not under one "apps" bucket
+        if package == "apps" and module.count(".") >= 1:
+            package = ".".join(module.split(".")[:2])
+        totals[package] += int(self_us) / 1000
+        counts[package] += 1
+
+    return sorted(((p, totals[p], counts[p]) for p in totals), key=lambda row: row[1], reverse=True)
+
+
+class Command(BaseCommand):
+    help = "Report worker boot time, peak RSS and which packages dominate import time."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-module",
+            default=os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"),
+            help="Settings profile to boot (default: current).",
+        )
+        parser.add_argument("--top", type=int, default=20, help="How many packages to list.")
+        parser.add_argument(
+            "--compare", nargs="+", metavar="SETTINGS_MODULE",
+            help="Only compare boot time and RSS of several profiles.",
+        )
+        parser.add_argument("--runs", type=int, default=3, help="Boots per profile for --compare (best is kept).")
+
+    def handle(self, *args, **opts):
+        if opts["compare"]:
+            self._compare(opts["compare"], opts["runs"])
+            return
+
+        module = opts["settings_module"]
+        elapsed, rss, output = boot(module)
+        rows = group_by_package(output)
+        total_ms = sum(ms for _, ms, _ in rows)
+
+        self.stdout.write(f"{module}: boot {elapsed * 1000:.0f} ms, peak RSS {rss:.1f} MB, "
+                          f"{sum(n for _, _, n in rows)} modules, {total_ms:.0f} ms importing\n")
+        self.stdout.write(f"{'package':<32}{'ms':>9}{'share':>8}{'modules':>9}")
+        for package, ms, count in rows[: opts["top"]]:
+            self.stdout.write(f"{package:<32}{ms:>9.1f}{ms / total_ms:>8.1%}{count:>9}")
+
+    def _compare(self, modules: List[str], runs: int):
+        results = []
+        for module in modules:
+            # importtime itself adds overhead; time clean boots
+            samples = [boot(module, importtime=False) for _ in range(runs)]
+            best = min(samples, key=lambda s: s[0])
+            results.append((module, best[0], best[1]))
+
+        base_time, base_rss = results[0][1], results[0][2]
+        self.stdout.write(f"{'profile':<28}{'boot ms':>10}{'speedup':>10}{'RSS MB':>10}{'saved':>10}")
+        for module, elapsed, rss in results:
+            self.stdout.write(
+                f"{module:<28}{elapsed * 1000:>10.0f}{base_time / elapsed:>9.2f}x{rss:>10.1f}{base_rss - rss:>10.1f}"
+            )
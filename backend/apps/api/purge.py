@@ -0,0 +1,193 @@
+"""
+Batched, debounced CDN purges by surrogate key.
+
+Publishing one story fires several signals in a row (revision publish,
+page move, featured item save...) and a bulk import fires hundreds. Keys are
+collected in a set and a background thread sends them in batches once the
+burst settles (`debounce`), or after `max_delay` at the latest so a steady
+stream of publishes still gets purged.
+
+The purge request is a POST to CDN_PURGE_URL with the keys both in a
+`Surrogate-Key` header (Fastly style) and in a JSON body, so it can be
+pointed at the CDN API directly or at a small purge proxy.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeDispatcher:
+    def __init__(
+        self,
+        url: str,
+        token: str = "",
+        debounce: float = 0.5,
+        max_delay: float = 5.0,
+        max_batch: int = 256,
+        timeout: float = 5.0,
+        retries: int = 3,
+    ):
+        self.url = url
+        self.token = token
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.retries = retries
+
+        self._cond = threading.Condition()
+        self._pending: dict = {}  # insertion-ordered set of keys
+        self._first_at: Optional[float] = None
+        self._last_at: Optional[float] = None
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def purge(self, keys: Iterable[str]) -> None:
+        with self._cond:
+            now = time.monotonic()
+            added = False
+            for key in keys:
+                if key and key not in self._pending:
+                    self._pending[key] = None
+                    added = True
+            if not added:
+                return
+
+            if self._first_at is None:
+                self._first_at = now
+            self._last_at = now
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="cdn-purge", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Send everything pending now. Returns False if it did not finish in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._first_at = self._last_at = float("-inf") if self._pending else None
+            self._cond.notify_all()
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _due_in(self, now: float) -> float:
+        if len(self._pending) >= self.max_batch:
+            return 0.0
+        quiet = self._last_at + self.debounce - now
+        overdue = self._first_at + self.max_delay - now
+        return max(0.0, min(quiet, overdue))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    if not self._cond.wait(timeout=30):
+                        # idle: let the thread go, purge() starts a new one
+                        self._thread = None
+                        return
+
+                wait = self._due_in(time.monotonic())
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                batch = list(self._pending)[: self.max_batch]
+                for key in batch:
+                    del self._pending[key]
+                if self._pending:
+                    self._first_at = self._last_at = time.monotonic() - self.debounce
+                else:
+                    self._first_at = self._last_at = None
+                self._in_flight += 1
+
+            try:
+                self._send(batch)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _send(self, keys: List[str]) -> None:
+        body = json.dumps({"surrogate_keys": keys}).encode()
+        headers = {
+            "Content-Type": "application/json",
+            "Surrogate-Key": " ".join(keys),
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        for attempt in range(1, self.retries + 1):
+            request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+                return
+            except (urllib.error.URLError, OSError) as exc:
+                if attempt == self.retries:
+                    logger.error("CDN purge of %d keys failed: %s", len(keys), exc)
+                    return
+                time.sleep(0.2 * 2 ** attempt)
+
+
+_dispatcher: Optional[PurgeDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> Optional[PurgeDispatcher]:
+    """
+    Process-wide dispatcher, or None when CDN_PURGE_URL is not configured.
+    """
+    global _dispatcher
+
+    url = getattr(settings, "CDN_PURGE_URL", "")
+    if not url:
+        return None
+
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = PurgeDispatcher(
+                url,
+                token=getattr(settings, "CDN_PURGE_TOKEN", ""),
+                debounce=getattr(settings, "CDN_PURGE_DEBOUNCE", 0.5),
+                max_delay=getattr(settings, "CDN_PURGE_MAX_DELAY", 5.0),
+                max_batch=getattr(settings, "CDN_PURGE_MAX_BATCH", 256),
+            )
+            # don't lose the last debounce window when a worker or command exits
+            atexit.register(_dispatcher.flush, 5.0)
+        return _dispatcher
+
+
+def purge_keys(keys: Iterable[str]) -> None:
+    dispatcher = get_dispatcher()
+    if dispatcher is not None:
+        dispatcher.purge(keys)
+
+
+@receiver(setting_changed)
+def _reset_dispatcher(setting, **kwargs):
+    global _dispatcher
+    if setting.startswith("CDN_PURGE_"):
+        with _dispatcher_lock:
+            _dispatcher = None
@@ -0,0 +1,251 @@
+"""
+Scheduled publishing that happens on time, onto warm caches.
+
+Wagtail publishes scheduled revisions (and unpublishes expired pages) when
+`publish_scheduled` runs, so with a cron job an embargoed story goes live up
+to a cron interval late, and the first readers then rebuild every payload
+that publishing invalidated. `run_scheduler` replaces the cron job:
+
+  - it sleeps until the next approved_go_live_at / expire_at (re-checking
+    every SCHEDULER_POLL_INTERVAL seconds for newly scheduled items) and
+    publishes or unpublishes exactly then, with the same actions and log
+    entries as `publish_scheduled`;
+  - SCHEDULER_LEAD_TIME seconds before an article goes live, its detail
+    payload is built from the scheduled revision into a staged cache key,
+    and any SCHEDULER_WARM_RENDITIONS of its images are rendered;
+  - right after publishing, the staged payload becomes the live article
+    payload, and the home and section payloads are rebuilt, so the first
+    readers hit warm caches.
+
+Run exactly one scheduler per site:
+
+    python manage.py run_scheduler
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+from urllib.parse import urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import HttpRequest
+from django.utils import timezone
+
+from rest_framework.request import Request
+
+from wagtail.images.models import Image as WagtailImage
+from wagtail.models import DraftStateMixin, Page, Revision
+
+from apps.content.models import ArticlePage, HomePage, SectionPage
+
+from .cache import (
+    CacheEntry, DEFAULT_TIMEOUT, STALE_GRACE, get_or_build, invalidate,
+    article_cache_key, home_cache_key, section_cache_key,
+)
+
+
+logger = logging.getLogger(__name__)
+
+LEAD_TIME = getattr(settings, "SCHEDULER_LEAD_TIME", 30)
+POLL_INTERVAL = getattr(settings, "SCHEDULER_POLL_INTERVAL", 10)
+# The API serves original image files; list filter specs here (e.g.
+# "fill-800x450") if the frontend starts asking for renditions.
+WARM_RENDITIONS = getattr(settings, "SCHEDULER_WARM_RENDITIONS", [])
+
+
+def warmup_request() -> Request:
+    """
+    A request as if it came to the public API host, for building payloads outside a request.
+    """
+    base = urlsplit(getattr(settings, "PUBLIC_BACKEND_BASE_URL", "") or "http://localhost")
+    request = HttpRequest()
+    request.method = "GET"
+    request.META = {
+        "SERVER_NAME": base.hostname or "localhost",
+        "SERVER_PORT": str(base.port or (443 if base.scheme == "https" else 80)),
+        "HTTP_HOST": base.netloc or "localhost",
+        "wsgi.url_scheme": base.scheme or "http",
+    }
+    request.path = request.path_info = "/"
+    return Request(request)
+
+
+def staged_key(slug: str) -> str:
+    return f"{article_cache_key(slug)}:staged"
+
+
+def _draft_models() -> List:
+    # like publish_scheduled: pages plus any other DraftStateMixin model
+    return [Page] + [
+        m for m in apps.get_models() if issubclass(m, DraftStateMixin) and not issubclass(m, Page)
+    ]
+
+
+def next_event_at(after: datetime) -> Optional[datetime]:
+    """
+    When the next scheduled publish or expiry after `after` is due.
+    """
+    times = [
+        Revision.objects.filter(approved_go_live_at__gt=after).aggregate(t=Min("approved_go_live_at"))["t"]
+    ]
+    for model in _draft_models():
+        times.append(model.objects.filter(live=True, expire_at__gt=after).aggregate(t=Min("expire_at"))["t"])
+    times = [t for t in times if t]
+    return min(times) if times else None
+
+
+class Scheduler:
+    def __init__(self, lead_time: float = LEAD_TIME, poll_interval: float = POLL_INTERVAL):
+        self.lead_time = timedelta(seconds=lead_time)
+        self.poll_interval = timedelta(seconds=poll_interval)
+        self.staged: Set[int] = set()  # revision ids
+        self.published = self.expired = 0
+
+    # -- one pass --------------------------------------------------------
+
+    def run_once(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Expire, publish and stage whatever is due at `now`; returns when to run again.
+        """
+        now = now or timezone.now()
+        self.expire_due(now)
+        self.publish_due(now)
+        self.stage_upcoming(now)
+        return self.wake_at(now)
+
+    def wake_at(self, now: datetime) -> datetime:
+        wake = now + self.poll_interval
+
+        event = next_event_at(now)
+        if event:
+            wake = min(wake, event)
+
+        # wake early enough to stage the next article that isn't staged yet
+        upcoming = (
+            Revision.objects.filter(approved_go_live_at__gt=now + self.lead_time)
+            .exclude(pk__in=self.staged)
+            .aggregate(t=Min("approved_go_live_at"))["t"]
+        )
+        if upcoming:
+            wake = min(wake, upcoming - self.lead_time)
+        return max(wake, now)
+
+    def expire_due(self, now: datetime) -> None:
+        for model in _draft_models():
+            for obj in list(model.objects.filter(live=True, expire_at__lte=now).order_by("expire_at")):
+                obj.unpublish(set_expired=True, log_action="wagtail.unpublish.scheduled")
+                self.expired += 1
+                logger.info("expired %s pk=%s", type(obj).__name__, obj.pk)
+                if isinstance(obj, Page):
+                    self.warm_after(obj.specific)
+
+    def publish_due(self, now: datetime) -> None:
+        for revision in Revision.objects.filter(approved_go_live_at__lte=now).order_by("approved_go_live_at"):
+            obj = revision.publish(log_action="wagtail.publish.scheduled")
+            self.staged.discard(revision.pk)
+            self.published += 1
+
+            late = (timezone.now() - revision.approved_go_live_at).total_seconds()
+            logger.info("published revision %s (%.3fs after its go-live time)", revision.pk, late)
+
+            obj = obj or revision.content_object
+            if isinstance(obj, Page):
+                self.warm_after(obj.specific, revision.pk)
+
+    def stage_upcoming(self, now: datetime) -> None:
+        revisions = (
+            Revision.objects.filter(approved_go_live_at__gt=now, approved_go_live_at__lte=now + self.lead_time)
+            .exclude(pk__in=self.staged)
+        )
+        for revision in revisions:
+            self.staged.add(revision.pk)
+            try:
+                self.stage(revision)
+            except Exception:
+                # staging is an optimisation; publishing must still happen
+                logger.exception("could not stage revision %s", revision.pk)
+
+    # -- warm-up ---------------------------------------------------------
+
+    def stage(self, revision: Revision) -> None:
+        page = revision.as_object()
+        if not isinstance(page, ArticlePage):
+            return
+
+        from .views import article_payload
+
+        payload, keys = article_payload(warmup_request(), page)
+        ttl = int(self.lead_time.total_seconds()) + 600
+        cache.set(staged_key(page.slug), (revision.pk, payload, keys), ttl)
+        self.warm_renditions(page)
+
+    def warm_renditions(self, page: ArticlePage) -> None:
+        if not WARM_RENDITIONS:
+            return
+
+        image_ids = [page.hero_image_id] if page.hero_image_id else []
+        image_ids += [block.value.id for block in page.body if block.block_type == "image" and block.value]
+        for image in WagtailImage.objects.filter(pk__in=image_ids):
+            image.get_renditions(*WARM_RENDITIONS)
+
+    def warm_after(self, page: Page, revision_id: Optional[int] = None) -> None:
+        """
+        Put fresh payloads in the cache right after `page` went live or was taken down.
+        """
+        from .views import build_article_payload, build_home_payload, build_section_payload
+
+        request = warmup_request()
+
+        if isinstance(page, ArticlePage):
+            key = article_cache_key(page.slug)
+            staged = cache.get(staged_key(page.slug))
+            cache.delete(staged_key(page.slug))
+
+            live = ArticlePage.objects.live().public().filter(pk=page.pk).first()
+            if live and staged and staged[0] == revision_id:
+                _, payload, keys = staged
+                # the revision had no publish dates yet
+                payload = {
+                    **payload,
+                    "first_published_at": live.first_published_at,
+                    "last_published_at": live.last_published_at,
+                }
+                entry = CacheEntry((payload, keys), 0.0, timezone.now().timestamp() + DEFAULT_TIMEOUT)
+                cache.set(key, entry, DEFAULT_TIMEOUT + STALE_GRACE)
+            else:
+                invalidate(key)
+                get_or_build(key, lambda: build_article_payload(request, page.slug))
+
+            section = page.section_slug
+        elif isinstance(page, SectionPage):
+            section = page.slug
+        elif isinstance(page, HomePage):
+            section = None
+        else:
+            return
+
+        invalidate(home_cache_key())
+        get_or_build(home_cache_key(), lambda: build_home_payload(request))
+        if section:
+            invalidate(section_cache_key(section))
+            get_or_build(section_cache_key(section), lambda: build_section_payload(request, section))
+
+    # -- service loop ----------------------------------------------------
+
+    def run_forever(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                wake = self.run_once()
+            except Exception:
+                logger.exception("scheduler pass failed")
+                wake = timezone.now() + self.poll_interval
+
+            delay = (wake - timezone.now()).total_seconds()
+            if delay > 0:
+                stop.wait(delay)
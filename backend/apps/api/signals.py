@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from wagtail.signals import page_published, page_unpublished
+
+from apps.content.models import ArticlePage, HomePage, SectionPage
+
+from .cache import invalidate, home_cache_key, article_cache_key, section_cache_key
+from .cdn import article_keys, home_key, section_key
+from .purge import purge_keys
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def invalidate_api_cache(sender, instance, **kwargs):
+    """
+    Drop cached payloads that depend on the page that just changed.
+    The next request rebuilds them (once, see apps.api.cache).
+    """
+    page = instance.specific
+
+    if isinstance(page, ArticlePage):
+        invalidate(article_cache_key(page.slug), home_cache_key(), section_cache_key(page.section_slug))
+    elif isinstance(page, SectionPage):
+        invalidate(section_cache_key(page.slug))
+    elif isinstance(page, HomePage):
+        invalidate(home_cache_key())
+
+
+@receiver(page_published)
+@receiver(page_unpublished)
+def purge_cdn(sender, instance, **kwargs):
+    """
+    Purge only the CDN objects tagged with this page's surrogate keys.
+    """
+    page = instance.specific
+
+    if isinstance(page, ArticlePage):
+        keys = article_keys(page)
+    elif isinstance(page, SectionPage):
+        keys = [section_key(page.slug)]
+    elif isinstance(page, HomePage):
+        keys = [home_key()]
+    else:
+        return
+
+    transaction.on_commit(lambda: purge_keys(keys))
@@ -1,3 +1,428 @@
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from wagtail.models import Page
+
+from apps.content import fixtures
+from apps.content.models import ArticlePage
+
+from . import cache as api_cache
+from .cache import CacheEntry, article_cache_key, get_or_build
+from .hot import HotCache, hot_cache
+from .purge import PurgeDispatcher, get_dispatcher
+from .scheduler import Scheduler, staged_key
+from .views import SectionFeedPagination
+
+
+def build_site():
+    home, [section] = fixtures.build_site("politics")
+    return home, section, fixtures.add_article(section, "budget-passed")
+
+
+class SingleFlightTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_rebuild_once(self):
+        db_hits = []
+        results = []
+        workers = 16
+        barrier = threading.Barrier(workers)
+
+        def builder():
+            db_hits.append(Page.objects.count())
+            time.sleep(0.2)
+            return {"pages": db_hits[0]}
+
+        def worker():
+            barrier.wait()
+            results.append(get_or_build("test:herd", builder, timeout=60))
+            connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(db_hits), 1)
+        self.assertEqual(len(results), workers)
+        self.assertTrue(all(r == results[0] for r in results))
+
+    def test_stale_value_served_while_another_process_rebuilds(self):
+        cache.set("test:stale", CacheEntry(value="old", delta=0.01, expires_at=time.time() - 1), 60)
+        # Simulate another worker holding the rebuild lock.
+        cache.add("test:stale:lock", "other-worker", 10)
+
+        def builder():
+            raise AssertionError("must not rebuild while another worker holds the lock")
+
+        self.assertEqual(get_or_build("test:stale", builder), "old")
+
+    def test_expired_value_is_rebuilt(self):
+        cache.set("test:expired", CacheEntry(value="old", delta=0.01, expires_at=time.time() - 1), 60)
+        self.assertEqual(get_or_build("test:expired", lambda: "new"), "new")
+        self.assertEqual(get_or_build("test:expired", lambda: "newer"), "new")
+
+    def test_early_expiry_depends_on_build_time(self):
+        now = time.time()
+        slow_and_close = CacheEntry(value=None, delta=30.0, expires_at=now + 1)
+        fast_and_far = CacheEntry(value=None, delta=0.001, expires_at=now + 60)
+
+        early = sum(api_cache._should_refresh(slow_and_close, now, 1.0) for _ in range(200))
+        late = sum(api_cache._should_refresh(fast_and_far, now, 1.0) for _ in range(200))
+
+        self.assertGreater(early, 150)
+        self.assertEqual(late, 0)
+
+
+class CachedPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear()
+        self.home, self.section, self.article = build_site()
+
+    def test_article_detail_is_served_from_cache(self):
+        url = reverse("article-detail", args=["budget-passed"])
+        self.assertEqual(self.client.get(url).json()["title"], "Budget passed")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()["title"], "Budget passed")
+
+    def test_publish_invalidates_article_and_home(self):
+        url = reverse("article-detail", args=["budget-passed"])
+        self.client.get(url)
+        self.client.get(reverse("home"))
+
+        self.article.title = "Budget passed after vote"
+        self.article.save_revision().publish()
+
+        self.assertEqual(self.client.get(url).json()["title"], "Budget passed after vote")
+        latest = self.client.get(reverse("home")).json()["latest"]
+        self.assertEqual(latest[0]["title"], "Budget passed after vote")
+
+    def test_section_first_page_is_cached(self):
+        url = reverse("section-feed", args=["politics"])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json()["results"][0]["title"], "Budget passed")
+
+        self.article.title = "Budget passed after vote"
+        self.article.save_revision().publish()
+        self.assertEqual(self.client.get(url).json()["results"][0]["title"], "Budget passed after vote")
+
+
+class HotCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear()
+        self.home, self.section, self.article = build_site()
+
+    def test_lru_eviction_expiry_and_stale_puts(self):
+        hot = HotCache(size=2, ttl=60)
+        hot.put("a", b"A", [], hot.generation())
+        hot.put("b", b"B", [], hot.generation())
+        hot.get("a")
+        hot.put("c", b"C", [], hot.generation())
+        self.assertIsNone(hot.get("b"))
+        self.assertEqual(hot.get("a").body, b"A")
+        self.assertEqual(hot.stats()["evictions"], 1)
+
+        # read before an invalidation, stored after it: dropped
+        generation = hot.generation()
+        hot.discard(["a"])
+        self.assertFalse(hot.put("a", b"old A", [], generation))
+        self.assertIsNone(hot.get("a"))
+
+        expired = HotCache(size=2, ttl=0)
+        expired.put("a", b"A", [], expired.generation())
+        self.assertIsNone(expired.get("a"))
+
+    def test_hot_article_skips_the_shared_cache_until_published(self):
+        url = reverse("article-detail", args=["budget-passed"])
+        first = self.client.get(url)
+        self.assertEqual(first.json()["title"], "Budget passed")
+
+        cache.delete(article_cache_key("budget-passed"))
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["Surrogate-Key"], first["Surrogate-Key"])
+        self.assertEqual(hot_cache.stats()["hit_rate"], 0.5)
+
+        self.article.title = "Budget passed after vote"
+        self.article.save_revision().publish()
+        self.assertEqual(self.client.get(url).json()["title"], "Budget passed after vote")
+        self.assertEqual(hot_cache.invalidations, 1)
+
+    def test_stats_are_staff_only(self):
+        url = reverse("hot-cache-stats")
+        self.client.get(reverse("article-detail", args=["budget-passed"]))
+
+        self.client.force_login(get_user_model().objects.create_user("reader"))
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(get_user_model().objects.create_user("editor", is_staff=True))
+        stats = self.client.get(url).json()
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 1))
+        self.assertEqual(stats["hottest"], [article_cache_key("budget-passed")])
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear()
+        self.home, self.section, _ = build_site()
+        self.go_live = timezone.now() + timedelta(minutes=5)
+
+        embargoed = self.section.add_child(instance=ArticlePage(title="Embargoed", slug="embargoed", live=False))
+        self.revision = embargoed.save_revision(approved_go_live_at=self.go_live)
+        self.embargoed = embargoed
+        self.scheduler = Scheduler(lead_time=30, poll_interval=3600)
+
+    def test_sleeps_until_staging_then_go_live(self):
+        before = self.go_live - timedelta(minutes=2)
+        self.assertEqual(self.scheduler.run_once(before), self.go_live - timedelta(seconds=30))
+
+        staging = self.go_live - timedelta(seconds=30)
+        self.assertEqual(self.scheduler.run_once(staging), self.go_live)
+        self.assertFalse(ArticlePage.objects.get(pk=self.embargoed.pk).live)
+        self.assertEqual(cache.get(staged_key("embargoed"))[0], self.revision.pk)
+
+    def test_publishes_on_time_onto_warm_caches(self):
+        self.scheduler.run_once(self.go_live - timedelta(seconds=10))
+        self.scheduler.run_once(self.go_live)
+
+        article = ArticlePage.objects.get(pk=self.embargoed.pk)
+        self.assertTrue(article.live)
+        self.assertEqual(self.scheduler.published, 1)
+        self.assertIsNone(cache.get(staged_key("embargoed")))
+
+        with self.assertNumQueries(0):
+            detail = self.client.get(reverse("article-detail", args=["embargoed"])).json()
+            home = self.client.get(reverse("home")).json()
+            feed = self.client.get(reverse("section-feed", args=["politics"])).json()
+        self.assertEqual(detail["title"], "Embargoed")
+        self.assertIsNotNone(detail["first_published_at"])
+        self.assertEqual(home["latest"][0]["slug"], "embargoed")
+        self.assertEqual(feed["results"][0]["slug"], "embargoed")
+
+    def test_expires_on_time(self):
+        self.scheduler.run_once(self.go_live)
+        article = ArticlePage.objects.get(pk=self.embargoed.pk)
+        article.expire_at = self.go_live + timedelta(hours=1)
+        article.save()
+
+        self.assertEqual(self.scheduler.run_once(self.go_live + timedelta(minutes=59, seconds=30)),
+                         self.go_live + timedelta(hours=1))
+        self.scheduler.run_once(self.go_live + timedelta(hours=1))
+
+        article.refresh_from_db()
+        self.assertFalse(article.live)
+        self.assertTrue(article.expired)
+        self.assertEqual(self.client.get(reverse("article-detail", args=["embargoed"])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("home")).json()["latest"][0]["slug"], "budget-passed")
+
+    def test_warmed_section_page_links_to_the_section_feed(self):
+        for i in range(SectionFeedPagination.page_size + 1):
+            self.section.add_child(instance=ArticlePage(
+                title=f"Story {i}", slug=f"story-{i}", first_published_at=timezone.now() - timedelta(minutes=i),
+            ))
+        self.scheduler.warm_after(self.section)
+
+        url = reverse("section-feed", args=["politics"])
+        with self.assertNumQueries(0):
+            next_url = self.client.get(url, {"utm_source": "newsletter"}).json()["next"]
+        self.assertTrue(next_url.startswith(settings.PUBLIC_BACKEND_BASE_URL + url + "?cursor="), next_url)
+        self.assertNotIn("utm_source", next_url)
+        last = f"story-{SectionFeedPagination.page_size}"
+        self.assertEqual(self.client.get(next_url).json()["results"][0]["slug"], last)
+
+
+class FakePurgeAPI:
+    """
+    Local HTTP stand-in for the CDN purge API; records every purge request.
+    """
+    def __init__(self):
+        self.requests = []
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                api.requests.append({
+                    "surrogate_key": self.headers["Surrogate-Key"],
+                    "body": json.loads(body),
+                })
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/purge"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def purged(self):
+        return [k for r in self.requests for k in r["body"]["surrogate_keys"]]
+
+
+class SurrogateKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear()
+        self.home, self.section, self.article = build_site()
+        self.article.tags.add("elections")
+        self.article.save_revision().publish()
+
+    def test_article_detail_headers(self):
+        response = self.client.get(reverse("article-detail", args=["budget-passed"]))
+
+        self.assertIn("s-maxage=", response["Cache-Control"])
+        self.assertEqual(
+            response["Surrogate-Key"].split(),
+            [f"article-{self.article.id}", "section-politics", "tag-elections"],
+        )
+
+    def test_feed_headers_name_every_article(self):
+        response = self.client.get(reverse("section-feed", args=["politics"]))
+        self.assertEqual(response["Surrogate-Key"].split(), ["section-politics", f"article-{self.article.id}"])
+
+        response = self.client.get(reverse("home"))
+        self.assertIn(f"article-{self.article.id}", response["Surrogate-Key"].split())
+
+    def test_not_found_is_not_tagged(self):
+        response = self.client.get(reverse("article-detail", args=["missing"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("Surrogate-Key", response)
+
+
+class ArchiveFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        hot_cache.clear()
+        self.home, self.section, self.article = build_site()
+        for i in range(3):
+            article = self.section.add_child(instance=ArticlePage(title=f"Story {i}", slug=f"story-{i}", live=False))
+            article.first_published_at = datetime(2026, 10, 18 + i % 2, 9, i, tzinfo=dt_timezone.utc)
+            article.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                article.save_revision().publish()
+
+    def test_month_and_day_feeds(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("archive-month", args=[2026, 10]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["slug"] for c in response.json()["results"]], ["story-1", "story-2", "story-0"])
+        self.assertEqual(response.json()["archive"]["count"], 3)
+        self.assertEqual({c["section"] for c in response.json()["results"]}, {"politics"})
+        self.assertEqual(response["Surrogate-Key"].split()[0], "archive-2026-10")
+
+        response = self.client.get(reverse("archive-day", args=[2026, 10, 19]))
+        self.assertEqual([c["slug"] for c in response.json()["results"]], ["story-1"])
+
+    def test_empty_or_invalid_dates_are_not_found(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse("archive-month", args=[2026, 9])).status_code, 404)
+        # answered from the rollup alone
+        self.assertFalse([q for q in queries.captured_queries if "content_articlepage" in q["sql"]])
+        self.assertEqual(self.client.get(reverse("archive-day", args=[2026, 2, 30])).status_code, 404)
+
+    def test_calendar(self):
+        response = self.client.get(reverse("archive-calendar"), {"year": 2026, "month": 10})
+        self.assertEqual(
+            response.json()["results"], [{"date": "2026-10-18", "count": 2}, {"date": "2026-10-19", "count": 1}]
+        )
+        self.assertEqual(self.client.get(reverse("archive-calendar"), {"month": 10}).status_code, 400)
+
+
+class PurgeDispatcherTests(TestCase):
+    def setUp(self):
+        self.api = FakePurgeAPI()
+        self.addCleanup(self.api.close)
+
+    def test_bursts_are_debounced_into_one_batch(self):
+        dispatcher = PurgeDispatcher(self.api.url, debounce=0.1)
+        dispatcher.purge(["article-1", "home"])
+        dispatcher.purge(["article-2", "home"])
+        dispatcher.purge(["section-politics"])
+
+        self.assertTrue(dispatcher.flush())
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertEqual(self.api.purged, ["article-1", "home", "article-2", "section-politics"])
+        self.assertEqual(self.api.requests[0]["surrogate_key"], "article-1 home article-2 section-politics")
+
+    def test_large_bursts_are_split_into_batches(self):
+        dispatcher = PurgeDispatcher(self.api.url, debounce=0.05, max_batch=10)
+        dispatcher.purge(f"article-{i}" for i in range(25))
+
+        self.assertTrue(dispatcher.flush())
+        self.assertEqual(len(self.api.requests), 3)
+        self.assertEqual(len(set(self.api.purged)), 25)
+
+    def test_publish_purges_only_the_article_keys(self):
+        home, section, article = build_site()
+        article.tags.add("elections")
+
+        with override_settings(CDN_PURGE_URL=self.api.url, CDN_PURGE_DEBOUNCE=0.05):
+            with self.captureOnCommitCallbacks(execute=True):
+                article.save_revision().publish()
+            self.assertTrue(get_dispatcher().flush())
+
+        article.refresh_from_db()
+        month = article.first_published_at.strftime("%Y-%m")
+        self.assertEqual(
+            sorted(self.api.purged),
+            sorted([f"article-{article.id}", "home", "section-politics", "tag-elections", f"archive-{month}", "archive"]),
+        )
+
+
+class ApiProfileTests(SimpleTestCase):
+    def test_api_profile_boots_without_admin_apps(self):
+        script = (
+            "import json, django; django.setup()\n"
+            "from django.apps import apps\n"
+            "from django.db.models.signals import post_delete\n"
+            "from django.urls import resolve\n"
+            "from wagtail.images import get_image_model\n"
+            "from wagtail.models.reference_index import ReferenceIndex\n"
+            "from wagtail.permissions import policy_registry\n"
+            "Image = get_image_model()\n"
+            "print(json.dumps({'apps': [a.label for a in apps.get_app_configs()],"
+            " 'home': resolve('/api/v1/home/').url_name,"
+            " 'images': [post_delete.has_listeners(Image), ReferenceIndex.is_indexed(Image),"
+            " type(policy_registry.get_by_type(Image, fallback=False)).__name__]}))"
+        )
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings_api"}
+        proc = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+        result = json.loads(proc.stdout)
+        self.assertEqual(result["home"], "home")
+        self.assertEqual(result["images"], [True, True, "CollectionOwnershipPermissionPolicy"])
+        for label in ("admin", "wagtailadmin", "drf_spectacular", "wagtailforms", "news", "analytics"):
+            self.assertNotIn(label, result["apps"])
@@ -1,8 +1,36 @@
 from django.urls import path
-from .views import HomeAPIView, SectionFeedAPIView, ArticleDetailAPIView
+from .views import (
+    HomeAPIView, SectionFeedAPIView, TopicFeedAPIView, ArticleDetailAPIView,
+    ArchiveFeedAPIView, ArchiveCalendarAPIView,
+    FeedAPIView, FollowListAPIView, FollowDetailAPIView,
+    MediaUploadListAPIView, MediaUploadDetailAPIView, SimilarImagesAPIView,
+    AdDecisionAPIView, NewsletterSubscribeAPIView, NewsletterUnsubscribeAPIView,
+    NewsletterConfirmAPIView, HotCacheStatsAPIView,
+)
 
 urlpatterns = [
     path("home/", HomeAPIView.as_view(), name="home"),
     path("sections/<slug:slug>/", SectionFeedAPIView.as_view(), name="section-feed"),
+    path("topics/<slug:slug>/", TopicFeedAPIView.as_view(), name="topic-feed"),
     path("articles/<slug:slug>/", ArticleDetailAPIView.as_view(), name="article-detail"),
+    path("archive/calendar/", ArchiveCalendarAPIView.as_view(), name="archive-calendar"),
+    path("archive/<int:year>/<int:month>/", ArchiveFeedAPIView.as_view(), name="archive-month"),
+    path("archive/<int:year>/<int:month>/<int:day>/", ArchiveFeedAPIView.as_view(), name="archive-day"),
+    path("ads/decide/", AdDecisionAPIView.as_view(), name="ad-decide"),
+    path("newsletter/subscribe/", NewsletterSubscribeAPIView.as_view(), name="newsletter-subscribe"),
+    path("newsletter/confirm/<str:token>/", NewsletterConfirmAPIView.as_view(), name="newsletter-confirm"),
+    path("newsletter/unsubscribe/<uuid:token>/", NewsletterUnsubscribeAPIView.as_view(), name="newsletter-unsubscribe"),
+
+    # Signed-in reader
+    path("me/feed/", FeedAPIView.as_view(), name="me-feed"),
+    path("me/follows/", FollowListAPIView.as_view(), name="me-follows"),
+    path("me/follows/<str:kind>/<int:target_id>/", FollowDetailAPIView.as_view(), name="me-follow-detail"),
+
+    # Newsroom
+    path("media/uploads/", MediaUploadListAPIView.as_view(), name="media-uploads"),
+    path("media/uploads/<uuid:upload_id>/", MediaUploadDetailAPIView.as_view(), name="media-upload-detail"),
+    path("media/images/<int:image_id>/similar/", SimilarImagesAPIView.as_view(), name="media-similar-images"),
+
+    # Staff
+    path("internal/hot-cache/", HotCacheStatsAPIView.as_view(), name="hot-cache-stats"),
 ]
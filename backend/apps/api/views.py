@@ -2,16 +2,43 @@ from __future__ import annotations
 
 from django.conf import settings
 
-from typing import Any, Dict, List, Optional
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import BasePermission, IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import replace_query_param
 
+from taggit.models import Tag
 from wagtail.images.models import Image as WagtailImage
 
-from apps.content.models import HomePage, SectionPage, ArticlePage
+from apps.accounts.feed import read_feed, rebuild_inbox
+from apps.accounts.models import Follow
+from apps.ads.engine import get_engine
+from apps.ads.models import SLOTS
+from apps.content import archive
+from apps.content.models import HomePage, SectionPage, ArticlePage, sections_for
+from apps.media.models import UploadSession
+from apps.media.similarity import parse_distance, similar_images
+from apps.media.uploads import UploadError, abort_upload, start_upload, write_chunk
+from apps.newsletter import optin
+from apps.newsletter.models import Subscriber
+from apps.taxonomy.models import Topic
+
+from .cache import get_or_build, home_cache_key, article_cache_key, section_cache_key
+from .hot import hot_cache
+from .cdn import add_cdn_headers, home_key, section_key, article_key, tag_key, topic_key, archive_key
 
 
 def absolute_url(request, url: str) -> str:
@@ -35,22 +62,32 @@ def _hero_url(article: ArticlePage) -> str:
     return a.hero_image.file.url if getattr(a, "hero_image", None) else ""
 
 
-def article_to_card(request, article: ArticlePage) -> dict:
+def article_to_card(request, article: ArticlePage, section: Optional[str] = None) -> dict:
     """
     A lightweight representation used in feeds (home + section).
+    Pass `section` (see section_slugs()) to skip the per-card parent lookup.
     """
     a = article.specific
+    if section is None:
+        section = getattr(a, "section_slug", "") or ""
     return {
         "title": a.title,
         "slug": a.slug,
         "subtitle": getattr(a, "subtitle", "") or "",
         "excerpt": getattr(a, "excerpt", "") or "",
         "first_published_at": a.first_published_at,
-        "section": getattr(a, "section_slug", "") or "",
+        "section": section,
         "hero_image_url": absolute_url(request, _hero_url(a)),
     }
 
 
+def section_slugs(articles: List[ArticlePage]) -> Dict[int, str]:
+    """
+    {article id: section slug} for a page of cards, in one query (articles may sit in date buckets).
+    """
+    return {pk: section.slug if section else "" for pk, section in sections_for(articles).items()}
+
+
 def resolve_streamfield_images(stream_data: Any, request=None) -> Any:
     """
     Convert StreamField blocks so React can render them easily.
@@ -117,6 +154,34 @@ def resolve_streamfield_images(stream_data: Any, request=None) -> Any:
     return resolved
 
 
+Built = Tuple[Optional[dict], List[str]]  # (payload, surrogate keys)
+
+
+def build_home_payload(request) -> Built:
+    homepage = HomePage.objects.live().public().first()
+    if not homepage:
+        return None, []
+
+    keys = [home_key()]
+
+    featured = []
+    for item in homepage.featured_items.all():
+        if item.article and item.article.live:
+            featured.append({
+                **article_to_card(request, item.article),
+                "label": item.label or ""
+            })
+            keys.append(article_key(item.article_id))
+
+    latest_qs = ArticlePage.objects.live().public().order_by("-first_published_at")[:12]
+    latest = []
+    for a in latest_qs:
+        latest.append(article_to_card(request, a))
+        keys.append(article_key(a.id))
+
+    return {"featured": featured, "latest": latest}, keys
+
+
 class HomeAPIView(APIView):
     """
     /api/v1/home/
@@ -125,22 +190,11 @@ class HomeAPIView(APIView):
       - latest (auto)
     """
     def get(self, request):
-        homepage = HomePage.objects.live().public().first()
-        if not homepage:
-            return Response({"detail": "HomePage not configured in CMS."}, status=404)
+        payload, keys = get_or_build(home_cache_key(), lambda: build_home_payload(request))
+        if payload is None:
+            return add_cdn_headers(Response({"detail": "HomePage not configured in CMS."}, status=404), [])
 
-        featured = []
-        for item in homepage.featured_items.all():
-            if item.article and item.article.live:
-                featured.append({
-                    **article_to_card(request, item.article),
-                    "label": item.label or ""
-                })
-
-        latest_qs = ArticlePage.objects.live().public().order_by("-first_published_at")[:12]
-        latest = [article_to_card(request, a) for a in latest_qs]
-
-        return Response({"featured": featured, "latest": latest})
+        return add_cdn_headers(Response(payload), keys)
 
 
 class SectionFeedPagination(CursorPagination):
@@ -155,24 +209,165 @@ class SectionFeedAPIView(ListAPIView):
     """
     pagination_class = SectionFeedPagination
 
+    def list(self, request, *args, **kwargs):
+        slug = self.kwargs["slug"]
+        if self.paginator.cursor_query_param in request.query_params:
+            data, keys = build_section_payload(request, slug, self.paginator)
+        else:
+            # the first page is what almost every reader gets: cache it like home
+            data, keys = get_or_build(section_cache_key(slug), lambda: build_section_payload(request, slug))
+        return add_cdn_headers(Response(data), keys)
+
+
+def build_section_payload(request, slug: str, paginator: Optional[CursorPagination] = None) -> Built:
+    paginator = paginator or SectionFeedPagination()
+    section = SectionPage.objects.live().public().filter(slug=slug).first()
+    if not section:
+        qs = ArticlePage.objects.none()
+    else:
+        qs = ArticlePage.objects.live().public().descendant_of(section).order_by("-first_published_at")
+
+    page = paginator.paginate_queryset(qs, request)
+    data = [article_to_card(request, a, slug) for a in page]
+    # The first page is cached and shared: link onwards from the canonical
+    # feed URL, not from whichever request (or scheduler warm-up) built it.
+    paginator.base_url = absolute_url(request, reverse("section-feed", args=[slug]))
+
+    keys = [section_key(slug)] + [article_key(a.id) for a in page]
+    return paginator.get_paginated_response(data).data, keys
+
+
+class TopicFeedAPIView(ListAPIView):
+    """
+    /api/v1/topics/<slug>/
+    Cursor paginated feed of a topic including all of its subtopics
+    """
+    pagination_class = SectionFeedPagination
+
+    def get_topic(self) -> Optional[Topic]:
+        if not hasattr(self, "_topic"):
+            self._topic = Topic.objects.filter(slug=self.kwargs["slug"]).first()
+        return self._topic
+
     def get_queryset(self):
-        section_slug = self.kwargs["slug"]
-        section = SectionPage.objects.live().public().filter(slug=section_slug).first()
-        if not section:
+        topic = self.get_topic()
+        if not topic:
             return ArticlePage.objects.none()
 
+        # one query over the indexed materialized path, subtopics included
         return (
             ArticlePage.objects.live()
             .public()
-            .descendant_of(section)
+            .filter(**topic.subtree_filter("topics__"))
+            .distinct()
             .order_by("-first_published_at")
         )
 
     def list(self, request, *args, **kwargs):
-        qs = self.get_queryset()
-        page = self.paginate_queryset(qs)
+        topic = self.get_topic()
+        if not topic:
+            return add_cdn_headers(Response({"detail": "Topic not found."}, status=404), [])
+
+        page = self.paginate_queryset(self.get_queryset())
         data = [article_to_card(request, a) for a in page]
-        return self.get_paginated_response(data)
+
+        response = self.get_paginated_response(data)
+        response.data["topic"] = {
+            "name": topic.name,
+            "slug": topic.slug,
+            "description": topic.description,
+            "breadcrumbs": topic.breadcrumbs(),
+            "children": list(topic.get_children().values("name", "slug")),
+        }
+
+        keys = [topic_key(topic.slug)] + [article_key(a.id) for a in page]
+        return add_cdn_headers(response, keys)
+
+
+class ArchiveFeedAPIView(ListAPIView):
+    """
+    /api/v1/archive/<year>/<month>/ and /api/v1/archive/<year>/<month>/<day>/
+    Cursor paginated feed of the articles first published in that month or on that day
+    """
+    pagination_class = SectionFeedPagination
+
+    def list(self, request, year, month, day=None):
+        try:
+            start, end = archive.period_bounds(year, month, day)
+        except ValueError:
+            return add_cdn_headers(Response({"detail": "Invalid date."}, status=404), [])
+
+        # empty periods are answered from the rollup without touching articles
+        count = archive.count_for(year, month, day)
+        if not count:
+            return add_cdn_headers(Response({"detail": "No articles for this date."}, status=404), [])
+
+        qs = archive.archived_articles(start, end).select_related("hero_image").order_by("-first_published_at")
+        page = self.paginate_queryset(qs)
+        sections = section_slugs(page)
+
+        response = self.get_paginated_response([article_to_card(request, a, sections[a.pk]) for a in page])
+        response.data["archive"] = {"year": year, "month": month, "day": day, "count": count}
+
+        keys = [archive_key(year, month)] + [article_key(a.id) for a in page]
+        return add_cdn_headers(response, keys)
+
+
+class ArchiveCalendarAPIView(APIView):
+    """
+    /api/v1/archive/calendar/[?year=2026[&month=10]]
+    Article counts per year, per month of a year, or per day of a month
+    """
+    def get(self, request):
+        year = request.query_params.get("year", "")
+        month = request.query_params.get("month", "")
+        if (year and not year.isdigit()) or (month and (not month.isdigit() or not year or not 1 <= int(month) <= 12)):
+            return Response({"detail": "year must be a number; month (1-12) needs a year."}, status=400)
+
+        year = int(year) if year else None
+        month = int(month) if month else None
+        return add_cdn_headers(Response({
+            "year": year,
+            "month": month,
+            "results": archive.calendar(year, month),
+        }), [archive_key()])
+
+
+def build_article_payload(request, slug: str) -> Built:
+    article = ArticlePage.objects.live().public().filter(slug=slug).first()
+    if not article:
+        return None, []
+    return article_payload(request, article.specific)
+
+
+def article_payload(request, a: ArticlePage) -> Built:
+    """
+    Detail payload of an article instance; also used on unsaved revisions (see apps.api.scheduler).
+    """
+    tag_objs = list(a.tags.all())
+    tags = [t.name for t in tag_objs]
+
+    hero_url = absolute_url(request, _hero_url(a))
+
+    # get_prep_value() gives JSON-serializable list of blocks
+    body_raw = a.body.get_prep_value()
+    body = resolve_streamfield_images(body_raw, request=request)
+
+    section = a.section_slug
+    keys = [article_key(a.id), section_key(section)] + [tag_key(t.slug) for t in tag_objs]
+
+    return {
+        "title": a.title,
+        "slug": a.slug,
+        "subtitle": a.subtitle or "",
+        "excerpt": a.excerpt or "",
+        "first_published_at": a.first_published_at,
+        "last_published_at": a.last_published_at,
+        "section": section,
+        "tags": tags,
+        "hero_image_url": hero_url,
+        "body": body,
+    }, keys
 
 
 class ArticleDetailAPIView(APIView):
@@ -181,28 +376,393 @@ class ArticleDetailAPIView(APIView):
     Detail endpoint with StreamField blocks resolved for React
     """
     def get(self, request, slug):
-        article = ArticlePage.objects.live().public().filter(slug=slug).first()
-        if not article:
-            return Response({"detail": "Article not found."}, status=404)
+        key = article_cache_key(slug)
+        # Hot articles are served as pre-rendered JSON from this worker's memory (apps/api/hot.py).
+        as_json = isinstance(request.accepted_renderer, JSONRenderer)
+        if as_json:
+            hot = hot_cache.get(key)
+            if hot is not None:
+                return add_cdn_headers(HttpResponse(hot.body, content_type="application/json"), hot.keys)
+        generation = hot_cache.generation()
+
+        # Misses are cached too, so a burst for an unknown slug does not reach the DB.
+        payload, keys = get_or_build(key, lambda: build_article_payload(request, slug))
+        if payload is None:
+            return add_cdn_headers(Response({"detail": "Article not found."}, status=404), [])
+        if not as_json:
+            return add_cdn_headers(Response(payload), keys)
+
+        body = JSONRenderer().render(payload)
+        hot_cache.put(key, body, keys, generation)
+        return add_cdn_headers(HttpResponse(body, content_type="application/json"), keys)
+
+
+class HotCacheStatsAPIView(APIView):
+    """
+    /api/v1/internal/hot-cache/
+    Hit rate of the in-process article tier, for the worker that answers this request
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        response = Response(hot_cache.stats())
+        response["Cache-Control"] = "private, no-store"
+        return response
+
+
+class FeedAPIView(APIView):
+    """
+    /api/v1/me/feed/?before=<article id>
+    The signed-in reader's "For You" feed, newest first
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+
+    def get(self, request):
+        before = request.query_params.get("before")
+        if before is not None and not before.isdigit():
+            return Response({"detail": "Invalid cursor."}, status=400)
 
-        a = article.specific
-        tags = [t.name for t in a.tags.all()]
+        articles, next_cursor = read_feed(
+            request.user, int(before) if before else None, limit=self.page_size
+        )
+        sections = section_slugs(articles)
+
+        next_url = None
+        if next_cursor is not None:
+            next_url = replace_query_param(request.build_absolute_uri(), "before", next_cursor)
+
+        response = Response({
+            "next": next_url,
+            "results": [article_to_card(request, a, sections[a.pk]) for a in articles],
+        })
+        response["Cache-Control"] = "private, no-store"
+        return response
 
-        hero_url = absolute_url(request, _hero_url(a))
 
-        # get_prep_value() gives JSON-serializable list of blocks
-        body_raw = a.body.get_prep_value()
-        body = resolve_streamfield_images(body_raw, request=request)
+FOLLOW_TARGETS = {
+    Follow.SECTION: lambda pk: SectionPage.objects.filter(pk=pk).exists(),
+    Follow.TAG: lambda pk: Tag.objects.filter(pk=pk).exists(),
+    Follow.AUTHOR: lambda pk: get_user_model().objects.filter(pk=pk).exists(),
+}
 
+
+class FollowListAPIView(APIView):
+    """
+    /api/v1/me/follows/
+    GET lists what the reader follows; POST {"kind": "section|tag|author", "target_id": 1} follows something
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        follows = request.user.follows.order_by("-created_at").values("kind", "target_id", "created_at")
+        return Response({"results": list(follows)})
+
+    def post(self, request):
+        kind = request.data.get("kind")
+        target_id = request.data.get("target_id")
+
+        if kind not in FOLLOW_TARGETS:
+            return Response({"detail": "kind must be one of: section, tag, author."}, status=400)
+        if not str(target_id).isdigit() or not FOLLOW_TARGETS[kind](int(target_id)):
+            return Response({"detail": f"Unknown {kind}."}, status=400)
+
+        _, created = Follow.objects.get_or_create(user=request.user, kind=kind, target_id=int(target_id))
+        if created:
+            rebuild_inbox(request.user)
+
+        return Response({"kind": kind, "target_id": int(target_id)}, status=201 if created else 200)
+
+
+class FollowDetailAPIView(APIView):
+    """
+    /api/v1/me/follows/<kind>/<target_id>/
+    DELETE unfollows
+    """
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request, kind, target_id):
+        deleted = Follow.objects.filter(user=request.user, kind=kind, target_id=target_id).first()
+        if not deleted:
+            return Response({"detail": "Not following."}, status=404)
+
+        deleted.delete()
+        rebuild_inbox(request.user)
+        return Response(status=204)
+
+
+class CanAddImages(BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_authenticated and request.user.has_perm("wagtailimages.add_image"))
+
+
+def upload_to_dict(request, session: UploadSession) -> dict:
+    image = session.image
+    return {
+        "id": str(session.id),
+        "filename": session.filename,
+        "size": session.total_size,
+        "offset": session.received,
+        "status": session.status,
+        "duplicate": session.duplicate,
+        "image": {
+            "id": image.id,
+            "title": image.title,
+            "url": absolute_url(request, image.file.url),
+        } if image else None,
+    }
+
+
+class MediaUploadListAPIView(APIView):
+    """
+    /api/v1/media/uploads/
+    POST {"filename": "a.jpg", "size": 123456, "title": "..."} opens a resumable upload
+    """
+    permission_classes = [CanAddImages]
+
+    def post(self, request):
+        size = request.data.get("size")
+        if not str(size).isdigit():
+            return Response({"detail": "size must be a positive number of bytes."}, status=400)
+
+        try:
+            session = start_upload(
+                request.user, request.data.get("filename", ""), int(size), request.data.get("title", "")
+            )
+        except UploadError as e:
+            return Response({"detail": str(e)}, status=e.status)
+
+        return Response(upload_to_dict(request, session), status=201)
+
+
+class MediaUploadDetailAPIView(APIView):
+    """
+    /api/v1/media/uploads/<id>/
+    GET returns the offset to resume from; PUT sends the next chunk as the raw
+    request body with an Upload-Offset header; DELETE abandons the upload
+    """
+    permission_classes = [CanAddImages]
+
+    def get_session(self, request, upload_id) -> Optional[UploadSession]:
+        sessions = UploadSession.objects.select_related("image")
+        if not request.user.is_superuser:
+            sessions = sessions.filter(created_by=request.user)
+        return sessions.filter(pk=upload_id).first()
+
+    def get(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if not session:
+            return Response({"detail": "Not found."}, status=404)
+        return Response(upload_to_dict(request, session))
+
+    def put(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if not session:
+            return Response({"detail": "Not found."}, status=404)
+
+        offset = request.headers.get("Upload-Offset", "")
+        length = request.headers.get("Content-Length", "")
+        if not offset.isdigit() or not length.isdigit():
+            return Response({"detail": "Upload-Offset and Content-Length headers are required."}, status=400)
+
+        # Read the body straight from the WSGI stream; touching request.data
+        # would buffer the whole chunk.
+        try:
+            write_chunk(session, int(offset), request.stream, int(length))
+        except UploadError as e:
+            return Response({"detail": str(e), "offset": session.received}, status=e.status)
+
+        status = 201 if session.status == UploadSession.COMPLETE else 200
+        return Response(upload_to_dict(request, session), status=status)
+
+    def delete(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if not session:
+            return Response({"detail": "Not found."}, status=404)
+        if session.status == UploadSession.COMPLETE:
+            return Response({"detail": "Upload is already finished."}, status=409)
+
+        abort_upload(session)
+        return Response(status=204)
+
+
+class SimilarImagesAPIView(APIView):
+    """
+    /api/v1/media/images/<id>/similar/?distance=10
+    Near-duplicates (crops, resizes, recompressions) of an image, closest first
+    """
+    permission_classes = [CanAddImages]
+
+    def get(self, request, image_id):
+        if not WagtailImage.objects.filter(pk=image_id).exists():
+            return Response({"detail": "Not found."}, status=404)
+
+        distance = parse_distance(request.query_params.get("distance", ""))
+        matches = similar_images(image_id, distance)
+
+        images = WagtailImage.objects.in_bulk([pk for _, pk in matches])
+        results = [
+            {
+                "id": pk,
+                "title": images[pk].title,
+                "url": absolute_url(request, images[pk].file.url),
+                "distance": d,
+            }
+            for d, pk in matches
+            if pk in images  # deleted since the index last synced
+        ]
+        return Response({"image": image_id, "distance": distance, "results": results})
+
+
+def ad_reader(request, data) -> str:
+    """
+    Who frequency caps count against: the reader id the frontend keeps, else
+    the session, else a hash of address and user agent.
+    """
+    reader = str(data.get("reader") or "")[:64]
+    if reader:
+        return reader
+    if request.session.session_key:
+        return request.session.session_key
+    raw = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return hashlib.sha1(raw.encode()).hexdigest()  # noqa: S324 - not a security use
+
+
+def ad_to_dict(request, ad: Optional[dict]) -> Optional[dict]:
+    if ad is None:
+        return None
+    return {**ad, "image_url": absolute_url(request, ad["image_url"])}
+
+
+class AdDecisionAPIView(APIView):
+    """
+    /api/v1/ads/decide/?slot=home-banner&variant=banner&section=politics&tags=budget,economy
+    Picks a creative for one slot.
+    POST {"slots": [{"slot": "home-banner", "variant": "banner"}, ...], "section": "...", "tags": [...]}
+    fills every slot on a page in one call, without repeating a campaign where possible.
+    """
+    def get(self, request):
+        params = request.query_params
+        slot = params.get("slot", "")
+        if slot not in SLOTS:
+            return Response({"detail": f"slot must be one of: {', '.join(sorted(SLOTS))}."}, status=400)
+
+        tags = [t for t in params.get("tags", "").split(",") if t]
+        [ad] = get_engine().decide(
+            [(slot, params.get("variant", ""))], params.get("section", ""), tags, ad_reader(request, params)
+        )
+        return self.no_store(Response({"slot": slot, "ad": ad_to_dict(request, ad)}))
+
+    def post(self, request):
+        data = request.data
+        slots = data.get("slots")
+        if not isinstance(slots, list) or not slots:
+            return Response({"detail": "slots must be a non-empty list."}, status=400)
+
+        requested = []
+        for item in slots:
+            item = item if isinstance(item, dict) else {"slot": item}
+            if item.get("slot") not in SLOTS:
+                return Response({"detail": f"Unknown slot: {item.get('slot')}."}, status=400)
+            requested.append((item["slot"], item.get("variant") or ""))
+
+        tags = data.get("tags") or []
+        if not isinstance(tags, list):
+            tags = [t for t in str(tags).split(",") if t]
+
+        ads = get_engine().decide(requested, data.get("section") or "", tags, ad_reader(request, data))
+        results = [{"slot": slot, "ad": ad_to_dict(request, ad)} for (slot, _), ad in zip(requested, ads)]
+        return self.no_store(Response({"results": results}))
+
+    def no_store(self, response):
+        # decisions depend on the reader's counters: never cache them
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+def _slug_list(value) -> List[str]:
+    if isinstance(value, list):
+        return [str(v) for v in value if v]
+    return [v for v in str(value or "").split(",") if v]
+
+
+def subscriber_to_dict(subscriber: Subscriber) -> dict:
+    return {
+        "email": subscriber.email,
+        "subscribed": subscriber.is_active,
+        "sections": [s.slug for s in subscriber.sections.all()],
+        "tags": [t.slug for t in subscriber.tags.all()],
+    }
+
+
+class NewsletterSubscribeAPIView(APIView):
+    """
+    /api/v1/newsletter/subscribe/
+    POST {"email": "...", "sections": ["politics"], "tags": ["budget"]} mails a confirmation link;
+    nothing is signed up or changed until it is used (apps/newsletter/optin.py)
+    """
+    def post(self, request):
+        email = str(request.data.get("email") or "").strip().lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            return Response({"detail": "Enter a valid email address."}, status=400)
+
+        section_slugs = _slug_list(request.data.get("sections"))
+        sections = list(SectionPage.objects.live().public().filter(slug__in=section_slugs))
+        if len(sections) != len(set(section_slugs)):
+            return Response({"detail": "Unknown section."}, status=400)
+
+        tag_slugs = _slug_list(request.data.get("tags"))
+        tags = list(Tag.objects.filter(slug__in=tag_slugs))
+        if len(tags) != len(set(tag_slugs)):
+            return Response({"detail": "Unknown tag."}, status=400)
+
+        optin.send_confirmation(email, sections, tags)
+        # the same answer whether or not the address is already subscribed
+        return Response({"detail": "Check your inbox to confirm."}, status=202)
+
+
+class NewsletterConfirmAPIView(APIView):
+    """
+    /api/v1/newsletter/confirm/<token>/
+    The link in the confirmation email. GET shows what will be applied; POST applies it
+    """
+    def get(self, request, token):
+        pending = optin.read_token(token)
+        if pending is None:
+            return Response({"detail": "Invalid or expired link."}, status=404)
         return Response({
-            "title": a.title,
-            "slug": a.slug,
-            "subtitle": a.subtitle or "",
-            "excerpt": a.excerpt or "",
-            "first_published_at": a.first_published_at,
-            "last_published_at": a.last_published_at,
-            "section": a.section_slug,
-            "tags": tags,
-            "hero_image_url": hero_url,
-            "body": body,
+            "email": pending.email,
+            "sections": list(SectionPage.objects.filter(pk__in=pending.section_ids).values_list("slug", flat=True)),
+            "tags": list(Tag.objects.filter(pk__in=pending.tag_ids).values_list("slug", flat=True)),
         })
+
+    def post(self, request, token):
+        pending = optin.read_token(token)
+        subscriber = optin.confirm(pending) if pending else None
+        if subscriber is None:
+            return Response({"detail": "Invalid or expired link."}, status=404)
+        return Response(subscriber_to_dict(subscriber))
+
+
+class NewsletterUnsubscribeAPIView(APIView):
+    """
+    /api/v1/newsletter/unsubscribe/<token>/
+    The link in every digest. GET shows the subscription; POST (one-click, RFC 8058) unsubscribes
+    """
+    def get(self, request, token):
+        subscriber = Subscriber.objects.filter(token=token).first()
+        if not subscriber:
+            return Response({"detail": "Not found."}, status=404)
+        return Response(subscriber_to_dict(subscriber))
+
+    def post(self, request, token):
+        subscriber = Subscriber.objects.filter(token=token).first()
+        if not subscriber:
+            return Response({"detail": "Not found."}, status=404)
+
+        if subscriber.is_active:
+            subscriber.is_active, subscriber.unsubscribed_at = False, timezone.now()
+            subscriber.save(update_fields=["is_active", "unsubscribed_at"])
+        return Response(subscriber_to_dict(subscriber))
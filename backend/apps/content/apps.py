@@ -3,4 +3,11 @@ from django.apps import AppConfig
 
 class ContentConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "apps.content"
\ No newline at end of file
+    name = "apps.content"
+
+    def ready(self):
+        from . import archive, buckets, search_queue
+
+        search_queue.register_signal_handlers()
+        archive.register_signal_handlers()
+        buckets.register_signal_handlers()
@@ -0,0 +1,146 @@
+"""
+Date archive: /archive/<year>/<month>/[<day>/] feeds and their calendar.
+
+How many articles were published on each day is kept in ArchiveDayCount,
+one row per day that has any, so the calendar and "is this archive page
+empty?" are answered from a few hundred small rows instead of a COUNT over
+the article table. A day is recounted (one indexed range COUNT) whenever an
+article first published on it is published, unpublished or deleted.
+
+Days are in the site time zone (TIME_ZONE). If an article's
+first_published_at is edited directly, the old day is not recounted; run
+
+    python manage.py rebuild_archive_counts
+
+to recompute the whole table.
+"""
+
+from __future__ import annotations
+
+import calendar as pycalendar
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear, TruncDate
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from wagtail.signals import page_published, page_unpublished
+
+from .models import ArchiveDayCount, ArticlePage
+
+
+def period_bounds(year: int, month: int, day: Optional[int] = None) -> Tuple[datetime, datetime]:
+    """
+    [start, end) of a month or a day in the site time zone. Raises ValueError for impossible dates.
+    """
+    if day is None:
+        first = date(year, month, 1)
+        last = first + timedelta(days=pycalendar.monthrange(year, month)[1])
+    else:
+        first = date(year, month, day)
+        last = first + timedelta(days=1)
+
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(first, time.min), tz),
+        timezone.make_aware(datetime.combine(last, time.min), tz),
+    )
+
+
+def archived_articles(start: datetime, end: datetime):
+    return ArticlePage.objects.live().public().filter(
+        first_published_at__gte=start, first_published_at__lt=end
+    )
+
+
+def article_day(article) -> Optional[date]:
+    if not article.first_published_at:
+        return None
+    return timezone.localdate(article.first_published_at)
+
+
+def recount_day(day: date) -> int:
+    count = archived_articles(*period_bounds(day.year, day.month, day.day)).count()
+    if count:
+        ArchiveDayCount.objects.update_or_create(day=day, defaults={"count": count})
+    else:
+        ArchiveDayCount.objects.filter(day=day).delete()
+    return count
+
+
+def rebuild() -> int:
+    """
+    Recompute every row from the article table. Returns the number of days with articles.
+    """
+    rows = (
+        ArticlePage.objects.live().public()
+        .exclude(first_published_at=None)
+        .annotate(day=TruncDate("first_published_at", tzinfo=timezone.get_current_timezone()))
+        .values("day")
+        .annotate(n=Count("pk"))
+        .order_by()
+    )
+    counts = [ArchiveDayCount(day=row["day"], count=row["n"]) for row in rows]
+
+    with transaction.atomic():
+        ArchiveDayCount.objects.all().delete()
+        ArchiveDayCount.objects.bulk_create(counts, batch_size=1000)
+    return len(counts)
+
+
+def count_for(year: int, month: int, day: Optional[int] = None) -> int:
+    if day is not None:
+        row = ArchiveDayCount.objects.filter(day=date(year, month, day)).values_list("count", flat=True).first()
+        return row or 0
+    return ArchiveDayCount.objects.filter(day__year=year, day__month=month).aggregate(n=Sum("count"))["n"] or 0
+
+
+def calendar(year: Optional[int] = None, month: Optional[int] = None) -> List[Dict]:
+    """
+    Article counts per year, per month of `year`, or per day of `month`.
+    """
+    rows = ArchiveDayCount.objects.order_by()
+    if year is None:
+        grouped = rows.annotate(year=ExtractYear("day")).values("year")
+        return [
+            {"year": r["year"], "count": r["count"]}
+            for r in grouped.annotate(count=Sum("count")).order_by("year")
+        ]
+
+    rows = rows.filter(day__year=year)
+    if month is None:
+        grouped = rows.annotate(month=ExtractMonth("day")).values("month")
+        return [
+            {"year": year, "month": r["month"], "count": r["count"]}
+            for r in grouped.annotate(count=Sum("count")).order_by("month")
+        ]
+
+    return [
+        {"date": d, "count": n}
+        for d, n in rows.filter(day__month=month).order_by("day").values_list("day", "count")
+    ]
+
+
+def _recount_later(article) -> None:
+    day = article_day(article)
+    if day is not None:
+        transaction.on_commit(lambda: recount_day(day))
+
+
+def page_changed_handler(sender, instance, **kwargs):
+    page = instance.specific
+    if isinstance(page, ArticlePage):
+        _recount_later(page)
+
+
+def post_delete_handler(sender, instance, **kwargs):
+    _recount_later(instance)
+
+
+def register_signal_handlers() -> None:
+    page_published.connect(page_changed_handler, dispatch_uid="archive_page_published")
+    page_unpublished.connect(page_changed_handler, dispatch_uid="archive_page_unpublished")
+    post_delete.connect(post_delete_handler, sender=ArticlePage, dispatch_uid="archive_article_deleted")
@@ -0,0 +1,178 @@
+"""
+Date buckets for big sections.
+
+Treebeard keeps a page's children as siblings under one path prefix, so
+with 100k+ articles directly under a SectionPage every new child, every
+sibling slug check and every admin explorer listing of the section works
+through all of them. Sections with `bucket_by_date` keep their articles in
+year/month DateBucketPages instead:
+
+    Politics/
+        2026/
+            2026-10/
+                budget-passed
+
+An article is filed into the month of its first publication right after its
+publish commits; drafts stay directly under the section until then. The
+buckets are otherwise invisible: articles keep /<section>/<slug>/ URLs,
+`ArticlePage.section_page` looks past them, and the API feeds select
+articles by descendant path anyway.
+
+After turning `bucket_by_date` on or off for a section, re-home its
+existing articles with
+
+    python manage.py rebucket_articles
+"""
+
+from __future__ import annotations
+
+import calendar
+import logging
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from wagtail.models import Page
+from wagtail.signals import page_published
+
+from .models import ArticlePage, DateBucketPage, SectionPage
+
+
+logger = logging.getLogger(__name__)
+
+
+def bucket_month(article: ArticlePage) -> Optional[date]:
+    if not article.first_published_at:
+        return None
+    return timezone.localdate(article.first_published_at).replace(day=1)
+
+
+def get_bucket(section: SectionPage, year: int, month: int) -> DateBucketPage:
+    """
+    The month bucket of `section`, creating it (and its year) if needed.
+    """
+    with transaction.atomic():
+        # fresh rows, locked so two publishes can't create the same bucket
+        section = SectionPage.objects.select_for_update().get(pk=section.pk)
+
+        year_page = DateBucketPage.objects.child_of(section).filter(year=year, month=None).first()
+        if year_page is None:
+            year_page = section.add_child(instance=DateBucketPage(title=str(year), slug=str(year), year=year))
+
+        month_page = DateBucketPage.objects.child_of(year_page).filter(month=month).first()
+        if month_page is None:
+            month_page = year_page.add_child(instance=DateBucketPage(
+                title=f"{calendar.month_name[month]} {year}", slug=f"{year}-{month:02d}", year=year, month=month,
+            ))
+    return month_page
+
+
+def home_for(article: ArticlePage, section: SectionPage) -> Optional[Page]:
+    """
+    Where the article belongs, or None to leave it where it is (unpublished articles in a bucketed section).
+    """
+    if not section.bucket_by_date:
+        return section
+    month = bucket_month(article)
+    if month is None:
+        return None
+    return get_bucket(section, month.year, month.month)
+
+
+def rehome(article_id: int) -> bool:
+    """
+    Move an article to the bucket (or section) it belongs in. Returns True if it moved.
+    """
+    article = ArticlePage.objects.filter(pk=article_id).first()
+    section = article and article.section_page
+    if not section:
+        return False
+
+    target = home_for(article, section)
+    if target is None or article.path[:-article.steplen] == target.path:
+        return False
+    if not Page._slug_is_available(article.slug, target, article):
+        # Only possible for articles saved before the section-wide slug check
+        # (ArticlePage.clean); runs after commit, so log rather than fail.
+        logger.warning("Not moving article %s: slug %r is already used under %s", article.pk, article.slug, target)
+        return False
+
+    article.move(target, pos="last-child")
+    return True
+
+
+def set_bucketing(section: SectionPage, enabled: bool) -> None:
+    """
+    Turn bucket_by_date on or off, also in the latest revision so the next publish from the admin keeps it.
+    """
+    section.bucket_by_date = enabled
+    section.save(update_fields=["bucket_by_date"])
+
+    revision = section.latest_revision
+    if revision and revision.content.get("bucket_by_date") != enabled:
+        revision.content["bucket_by_date"] = enabled
+        revision.save(update_fields=["content"])
+
+
+def rebucket(section: SectionPage, batch_size: int = 500,
+             progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Re-home every article of `section` per its current setting and drop empty buckets. Returns how many moved.
+    """
+    section = SectionPage.objects.get(pk=section.pk)
+    buckets: Dict[Tuple[int, int], str] = {
+        (b.year, b.month): b.path for b in DateBucketPage.objects.descendant_of(section).filter(month__isnull=False)
+    }
+
+    # find what has to move without touching the tree; moving is the slow part
+    misplaced = []
+    rows = ArticlePage.objects.descendant_of(section).values_list("pk", "path", "first_published_at").order_by("pk")
+    for pk, path, first_published_at in rows.iterator(chunk_size=5000):
+        parent = path[:-section.steplen]
+        if not section.bucket_by_date:
+            wanted = section.path
+        elif first_published_at is None:
+            continue
+        else:
+            month = timezone.localdate(first_published_at)
+            wanted = buckets.get((month.year, month.month))
+        if parent != wanted:
+            misplaced.append(pk)
+
+    moved = 0
+    for start in range(0, len(misplaced), batch_size):
+        with transaction.atomic():
+            for pk in misplaced[start:start + batch_size]:
+                moved += rehome(pk)
+        if progress:
+            progress(min(start + batch_size, len(misplaced)), len(misplaced))
+
+    prune(section)
+    return moved
+
+
+def prune(section: SectionPage) -> int:
+    """
+    Delete empty buckets under `section` (months first, then the years they leave empty).
+    """
+    deleted = 0
+    while True:
+        empty = list(DateBucketPage.objects.descendant_of(section).filter(numchild=0).order_by("-depth"))
+        if not empty:
+            return deleted
+        for bucket in empty:
+            bucket.delete()
+            deleted += 1
+
+
+def page_published_handler(sender, instance, **kwargs):
+    page = instance.specific
+    if isinstance(page, ArticlePage):
+        # after the publish commits: never reshape the tree inside the editor's save
+        transaction.on_commit(lambda: rehome(page.pk))
+
+
+def register_signal_handlers() -> None:
+    page_published.connect(page_published_handler, dispatch_uid="buckets_page_published")
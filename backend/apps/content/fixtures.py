@@ -0,0 +1,32 @@
+"""
+Page tree fixtures for the apps' tests.
+
+    home, [politics, sports] = build_site("politics", "sports")
+    budget = add_article(politics, "budget-passed", title="Budget passed")
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from wagtail.models import Page
+
+from .models import ArticlePage, HomePage, SectionPage
+
+
+def build_site(*section_slugs: str, **section_fields) -> Tuple[HomePage, List[SectionPage]]:
+    """
+    A HomePage under the root with one SectionPage per slug (default: "politics").
+    `section_fields` are set on every section.
+    """
+    home = Page.get_first_root_node().add_child(instance=HomePage(title="Home", slug="test-home"))
+    sections = [
+        home.add_child(instance=SectionPage(title=slug.replace("-", " ").title(), slug=slug, **section_fields))
+        for slug in section_slugs or ("politics",)
+    ]
+    return home, sections
+
+
+def add_article(parent: Page, slug: str, **fields) -> ArticlePage:
+    fields.setdefault("title", slug.replace("-", " ").capitalize())
+    return parent.add_child(instance=ArticlePage(slug=slug, **fields))
@@ -0,0 +1,130 @@
+"""
+Compare a flat section with a date-bucketed one.
+
+    python manage.py benchmark_section_tree --articles 20000
+
+Fills two throwaway sections with the same articles: one with every article
+directly under the section, one filed into year/month DateBucketPages. It
+times each insert, the Wagtail admin explorer listing and the first page of
+the section feed. Everything happens in one transaction that is rolled
+back, so nothing is left behind. The run does hold the write lock
+throughout, so point it at a copy of production data, not the live
+database.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from wagtail.models import Page
+
+from apps.content.buckets import get_bucket
+from apps.content.models import ArticlePage, DateBucketPage, HomePage, SectionPage
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _timed(fn, repeat: int = 3) -> float:
+    """
+    Median wall time of `fn()` in milliseconds.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+class Command(BaseCommand):
+    help = "Time inserts, the admin explorer and the section feed for a flat vs a date-bucketed section."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--articles", type=int, default=5000)
+        parser.add_argument("--months", type=int, default=24, help="Spread the articles over this many months.")
+        parser.add_argument("--window", type=int, default=200, help="Inserts averaged at the start and end.")
+
+    def handle(self, *args, **opts):
+        results = {}
+        try:
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=["*"]):
+                home = HomePage.objects.first() or Page.get_first_root_node().add_child(
+                    instance=HomePage(title="Benchmark home", slug="benchmark-home")
+                )
+                user = get_user_model().objects.create_superuser("benchmark-section-tree", "", None)
+                client = Client()
+                client.force_login(user)
+
+                for layout in ("flat", "bucketed"):
+                    results[layout] = self.run(home, client, layout == "bucketed", opts)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        rows = [
+            (f"insert, first {opts['window']} (ms avg)", "insert_first"),
+            (f"insert, last {opts['window']} (ms avg)", "insert_last"),
+            ("admin explorer: section (ms)", "explore_section"),
+            ("admin explorer: month bucket (ms)", "explore_bucket"),
+            ("section feed, first page (ms)", "feed"),
+        ]
+        self.stdout.write(f"{opts['articles']} articles over {opts['months']} months")
+        self.stdout.write(f"{'':36}{'flat':>10}{'bucketed':>10}")
+        for label, key in rows:
+            cells = [results[layout].get(key) for layout in ("flat", "bucketed")]
+            self.stdout.write(f"{label:36}" + "".join(f"{c:>10.1f}" if c is not None else f"{'-':>10}" for c in cells))
+
+    def run(self, home, client, bucketed: bool, opts) -> dict:
+        section = home.add_child(instance=SectionPage(
+            title=f"Benchmark {'bucketed' if bucketed else 'flat'}",
+            slug=f"benchmark-{'bucketed' if bucketed else 'flat'}-{int(time.time())}",
+            bucket_by_date=bucketed,
+        ))
+
+        count, window = opts["articles"], opts["window"]
+        span = timedelta(days=30 * opts["months"])
+        start = timezone.now() - span
+        inserts = []
+        for i in range(count):
+            when = start + span * i / count
+            article = ArticlePage(title=f"Story {i}", slug=f"story-{i}", first_published_at=when)
+
+            started = time.perf_counter()
+            if bucketed:
+                local = timezone.localdate(when)
+                parent = get_bucket(section, local.year, local.month)
+            else:
+                parent = SectionPage.objects.get(pk=section.pk)
+            parent.add_child(instance=article)
+            inserts.append(time.perf_counter() - started)
+
+            if opts["verbosity"] > 1 and (i + 1) % 1000 == 0:
+                self.stdout.write(f"{section.slug}: {i + 1}/{count}")
+
+        def explore(page):
+            response = client.get(reverse("wagtailadmin_explore", args=[page.id]), SERVER_NAME="localhost")
+            assert response.status_code == 200, response.status_code
+
+        feed = ArticlePage.objects.live().public().descendant_of(section).order_by("-first_published_at")
+        result = {
+            "insert_first": statistics.mean(inserts[:window]) * 1000,
+            "insert_last": statistics.mean(inserts[-window:]) * 1000,
+            "explore_section": _timed(lambda: explore(section)),
+            "feed": _timed(lambda: list(feed[:20])),
+        }
+        if bucketed:
+            bucket = DateBucketPage.objects.descendant_of(section).filter(month__isnull=False).last()
+            result["explore_bucket"] = _timed(lambda: explore(bucket))
+        return result
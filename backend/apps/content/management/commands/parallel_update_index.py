@@ -0,0 +1,122 @@
+"""
+Rebuild the search index using several processes.
+
+    python manage.py parallel_update_index --workers 8 --chunk-size 500
+
+Pages are listed in tree order (by `path`) and split into chunks, so each
+worker indexes whole runs of neighbouring pages; other indexed models are
+split by primary key. Each worker process runs `add_bulk()` on its chunks
+against the live index. The rebuild is started and finished (stale entries,
+norms...) once, in this process.
+
+The rebuild is not atomic: ATOMIC_REBUILD builds inside one transaction or
+into a hidden index that worker processes can't write to, so it is ignored
+here. Use `update_index` when an atomic swap matters more than speed.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from typing import List, Tuple
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from wagtail.models import Page
+from wagtail.search.backends import get_search_backend
+from wagtail.search.index import get_indexed_models
+
+
+DEFAULT_CHUNK_SIZE = 500
+
+Chunk = Tuple[str, str, List]  # (backend name, model label, pks)
+
+
+def _index_chunk(chunk: Chunk) -> int:
+    backend_name, model_label, pks = chunk
+    model = apps.get_model(model_label)
+    objs = list(model.get_indexed_objects().filter(pk__in=pks))
+    if objs:
+        get_search_backend(backend_name).add_bulk(model, objs)
+    return len(objs)
+
+
+def _chunks(backend_name: str, model, chunk_size: int):
+    qs = model._default_manager.all()
+    # Page models: keep subtrees together
+    ordering = "path" if issubclass(model, Page) else "pk"
+
+    # Only index each page once, through its most specific class.
+    if issubclass(model, Page):
+        qs = qs.filter(content_type=ContentType.objects.get_for_model(model))
+
+    pks = list(qs.order_by(ordering).values_list("pk", flat=True))
+    label = model._meta.label
+    for start in range(0, len(pks), chunk_size):
+        yield backend_name, label, pks[start:start + chunk_size]
+
+
+class Command(BaseCommand):
+    help = "Rebuild the search index with the page tree split into chunks across processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", dest="backend_name", default="default")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **opts):
+        backend_name = opts["backend_name"]
+        backend = get_search_backend(backend_name)
+
+        # An atomic rebuild happens inside one transaction / a hidden index that
+        # worker processes can't write to, so always use the plain rebuilder.
+        rebuilder_class = type(backend).rebuilder_class
+        if backend.rebuilder_class is not rebuilder_class:
+            self.stdout.write(f"{backend_name}: ATOMIC_REBUILD is ignored for parallel rebuilds")
+
+        models = get_indexed_models()
+
+        chunks: List[Chunk] = []
+        for model in models:
+            chunks.extend(_chunks(backend_name, model, opts["chunk_size"]))
+
+        # Group models by the index they live in, like update_index does.
+        models_by_index = {}
+        for model in models:
+            index = backend.get_index_for_model(model)
+            key = index.get_key() if hasattr(index, "get_key") else id(index)
+            models_by_index.setdefault(key, (index, []))[1].append(model)
+
+        rebuilders = []
+        if rebuilder_class:
+            for index, index_models in models_by_index.values():
+                rebuilder = rebuilder_class(index)
+                index = rebuilder.start()
+                for model in index_models:
+                    if hasattr(index, "add_model"):
+                        index.add_model(model)
+                rebuilders.append(rebuilder)
+
+        workers = max(1, min(opts["workers"], len(chunks)))
+        self.stdout.write(f"{backend_name}: {len(chunks)} chunks across {workers} worker(s)")
+
+        started = time.perf_counter()
+        if workers == 1:
+            indexed = sum(_index_chunk(chunk) for chunk in chunks)
+        else:
+            # Forked workers inherit the loaded app registry; they must not
+            # share the parent's DB connection, so close it before forking.
+            connections.close_all()
+            ctx = multiprocessing.get_context("fork")
+            with ctx.Pool(workers, initializer=connections.close_all) as pool:
+                indexed = sum(pool.imap_unordered(_index_chunk, chunks))
+
+        for rebuilder in rebuilders:
+            rebuilder.finish()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{backend_name}: indexed {indexed} objects in {elapsed:.1f}s")
@@ -0,0 +1,42 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.content.search_queue import DEFAULT_BATCH_SIZE, process_batch
+
+
+class Command(BaseCommand):
+    help = "Background worker: apply queued search index updates in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--interval", type=float, default=2.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+
+    def handle(self, *args, **opts):
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        total = 0
+        while not self._stopping:
+            started = time.perf_counter()
+            count = process_batch(opts["batch_size"])
+            total += count
+
+            if count and opts["verbosity"] > 1:
+                self.stdout.write(f"indexed {count} objects in {time.perf_counter() - started:.2f}s")
+
+            if count < opts["batch_size"]:
+                if opts["once"]:
+                    break
+                time.sleep(opts["interval"])
+
+        self.stdout.write(f"indexed {total} objects")
+
+    def _stop(self, *args):
+        self._stopping = True
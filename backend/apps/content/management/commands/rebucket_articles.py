@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.content.buckets import rebucket, set_bucketing
+from apps.content.models import SectionPage
+
+
+class Command(BaseCommand):
+    help = (
+        "Move articles into (or out of) year/month date buckets to match each section's "
+        "bucket_by_date setting, then delete empty buckets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("sections", nargs="*", metavar="slug", help="Only these sections (default: all).")
+        parser.add_argument(
+            "--enable", action="store_true",
+            help="Turn bucket_by_date on for the given sections first.",
+        )
+        parser.add_argument(
+            "--disable", action="store_true",
+            help="Turn bucket_by_date off for the given sections first.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Moves per transaction.")
+
+    def handle(self, *args, **opts):
+        if opts["enable"] and opts["disable"]:
+            raise CommandError("Pass --enable or --disable, not both.")
+
+        sections = SectionPage.objects.order_by("path")
+        if opts["sections"]:
+            sections = sections.filter(slug__in=opts["sections"])
+            missing = set(opts["sections"]) - set(sections.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Unknown sections: {', '.join(sorted(missing))}")
+        elif opts["enable"] or opts["disable"]:
+            raise CommandError("Name the sections to --enable or --disable.")
+
+        for section in sections:
+            if opts["enable"] or opts["disable"]:
+                set_bucketing(section, opts["enable"])
+
+            started = time.perf_counter()
+
+            def progress(done, total):
+                if opts["verbosity"] > 1:
+                    self.stdout.write(f"{section.slug}: {done}/{total}")
+
+            moved = rebucket(section, opts["batch_size"], progress)
+            layout = "date buckets" if section.bucket_by_date else "flat"
+            self.stdout.write(
+                f"{section.slug} ({layout}): moved {moved} articles in {time.perf_counter() - started:.1f}s"
+            )
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:30
+
+import modelcluster.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_search_index_queue'),
+        ('taxonomy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articlepage',
+            name='topics',
+            field=modelcluster.fields.ParentalManyToManyField(blank=True, related_name='articles', to='taxonomy.topic'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:49
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def count_existing_articles(apps, schema_editor):
+    # Historical models have no .public(), so private pages are counted
+    # here; `manage.py rebuild_archive_counts` gives the exact figures.
+    ArticlePage = apps.get_model("content", "ArticlePage")
+    ArchiveDayCount = apps.get_model("content", "ArchiveDayCount")
+
+    rows = (
+        ArticlePage.objects.filter(live=True)
+        .exclude(first_published_at=None)
+        .annotate(day=TruncDate("first_published_at", tzinfo=timezone.get_current_timezone()))
+        .values("day")
+        .annotate(n=Count("pk"))
+        .order_by()
+    )
+    ArchiveDayCount.objects.bulk_create(
+        [ArchiveDayCount(day=row["day"], count=row["n"]) for row in rows], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_articlepage_topics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveDayCount',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_articles, migrations.RunPython.noop),
+    ]
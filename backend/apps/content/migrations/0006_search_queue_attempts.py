@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_date_buckets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchindexqueueitem',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
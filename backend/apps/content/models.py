@@ -1,18 +1,53 @@
+from typing import Dict, List, Optional
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.http import Http404
 from django.utils.text import slugify
 
 from wagtail.models import Page, Orderable
 from wagtail.fields import RichTextField, StreamField
+from wagtail.admin.forms import WagtailAdminPageForm
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel, InlinePanel
 from wagtail.images.blocks import ImageChooserBlock
 from wagtail.blocks import CharBlock, RichTextBlock, StructBlock
 from wagtail.search import index
 
-from modelcluster.fields import ParentalKey
+from modelcluster.fields import ParentalKey, ParentalManyToManyField
 from modelcluster.contrib.taggit import ClusterTaggableManager
 from taggit.models import TaggedItemBase
 
 
+# Durable queue of pending search index updates (see search_queue.py)
+class SearchIndexQueueItem(models.Model):
+    content_type = models.ForeignKey("contenttypes.ContentType", on_delete=models.CASCADE, related_name="+")
+    object_id = models.CharField(max_length=255)
+    # when the row becomes due; pushed into the future after a failed attempt
+    queued_at = models.DateTimeField(db_index=True)
+    # failed indexing attempts since the object was last saved
+    attempts = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # one row per object: repeated saves just bump queued_at
+            models.UniqueConstraint(fields=["content_type", "object_id"], name="unique_search_queue_object"),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id}"
+
+
+# Date archive rollup (see archive.py)
+class ArchiveDayCount(models.Model):
+    # live, public articles first published on `day` (site time zone);
+    # days without articles have no row
+    day = models.DateField(primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.count}"
+
+
 # Tags for ArticlePage
 class ArticlePageTag(TaggedItemBase):
     content_object = ParentalKey(
@@ -55,20 +90,67 @@ class HomePage(Page):
     ]
 
 
+def ancestor_paths(page) -> List[str]:
+    return [page.path[:i] for i in range(page.steplen, len(page.path), page.steplen)]
+
+
 class SectionPage(Page):
     # Represents a section (Politics, Sports...)
     description = RichTextField(blank=True)
 
+    # Big sections: keep articles in year/month DateBucketPages instead of
+    # directly under the section (see apps/content/buckets.py).
+    bucket_by_date = models.BooleanField(
+        default=False,
+        help_text="File published articles into year/month folders. Run rebucket_articles after changing this.",
+    )
+
     content_panels = Page.content_panels + [
         FieldPanel("description"),
     ]
+    settings_panels = Page.settings_panels + [
+        FieldPanel("bucket_by_date"),
+    ]
 
     # Tree rules
     parent_page_types = ["content.HomePage"]
-    subpage_types = ["content.ArticlePage"]
+    subpage_types = ["content.ArticlePage", "content.DateBucketPage"]
 
     api_fields = []
 
+    def route(self, request, path_components):
+        try:
+            return super().route(request, path_components)
+        except Http404:
+            # Articles in date buckets keep their /<section>/<slug>/ URL
+            # (DateBucketPage.set_url_path), so look past the buckets for them.
+            if len(path_components) != 1:
+                raise
+            article = ArticlePage.objects.descendant_of(self).filter(slug=path_components[0]).first()
+            if not article:
+                raise
+            return article.specific.route(request, [])
+
+
+class DateBucketPage(Page):
+    """
+    A year (month is None) or month folder of articles under a SectionPage.
+    Created and filled automatically; invisible to URLs and the API.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    parent_page_types = ["content.SectionPage", "content.DateBucketPage"]
+    subpage_types = ["content.DateBucketPage", "content.ArticlePage"]
+    is_creatable = False
+
+    api_fields = []
+
+    def set_url_path(self, parent):
+        # Share the section's URL path, so articles filed here keep /<section>/<slug>/.
+        self.url_path = parent.url_path if parent else "/"
+        return self.url_path
+
 
 # Article blocks
 class PullQuoteBlock(StructBlock):
@@ -88,6 +170,30 @@ ARTICLE_BODY_BLOCKS = [
 ]
 
 
+def article_slug_is_available(slug: str, parent: Page, page: Optional[Page] = None) -> bool:
+    """
+    Like Page._slug_is_available, but across the whole section: articles in
+    its date buckets all share the section's URL space.
+    """
+    section = SectionPage.objects.filter(path__in=ancestor_paths(parent) + [parent.path]).first()
+    if section is None:
+        return Page._slug_is_available(slug, parent, page)
+
+    articles = ArticlePage.objects.descendant_of(section).filter(slug=slug)
+    if page is not None and page.pk:
+        articles = articles.not_page(page)
+    return not articles.exists()
+
+
+class ArticlePageForm(WagtailAdminPageForm):
+    def clean(self):
+        cleaned_data = super().clean()
+        slug = cleaned_data.get("slug")
+        if slug and self.parent_page and not article_slug_is_available(slug, self.parent_page, self.instance):
+            self.add_error("slug", f"The slug '{slug}' is already in use in this section.")
+        return cleaned_data
+
+
 class ArticlePage(Page):
     # Core article fields
     subtitle = models.CharField(max_length=250, blank=True)
@@ -103,6 +209,10 @@ class ArticlePage(Page):
 
     tags = ClusterTaggableManager(through=ArticlePageTag, blank=True)
 
+    # Topic hierarchy (apps.taxonomy); an article under "Provincial" also
+    # shows up in the "Elections" and "Politics" topic feeds.
+    topics = ParentalManyToManyField("taxonomy.Topic", blank=True, related_name="articles")
+
     # Search indexing
     search_fields = Page.search_fields + [
         index.SearchField("subtitle"),
@@ -110,24 +220,56 @@ class ArticlePage(Page):
         index.SearchField("body"),
     ]
 
+    # Don't index `body` inside the editor's save/publish request: saves are
+    # queued (apps/content/search_queue.py) and indexed in batches by
+    # `manage.py process_search_queue`.
+    search_auto_update = False
+
     content_panels = Page.content_panels + [
         MultiFieldPanel([
             FieldPanel("subtitle"),
             FieldPanel("excerpt"),
             FieldPanel("hero_image"),
             FieldPanel("tags"),
+            FieldPanel("topics"),
         ], heading="Article metadata"),
         FieldPanel("body"),
     ]
 
-    parent_page_types = ["content.SectionPage"]
+    parent_page_types = ["content.SectionPage", "content.DateBucketPage"]
     subpage_types = []
 
+    base_form_class = ArticlePageForm
+
+    def _check_slug_is_unique(self):
+        # run by both clean() and the drafts-only minimal_clean()
+        super()._check_slug_is_unique()
+        parent = self.get_parent()
+        if parent and not article_slug_is_available(self.slug, parent, self):
+            raise ValidationError({"slug": f"The slug '{self.slug}' is already in use in this section."})
+
     # Convenience for feeds
+    @property
+    def section_page(self):
+        # the parent, or further up when the article sits in a date bucket
+        return SectionPage.objects.filter(path__in=ancestor_paths(self)).first()
+
     @property
     def section_slug(self):
-        parent = self.get_parent().specific
-        return getattr(parent, "slug", "")
+        return getattr(self.section_page, "slug", "")
 
     # Later we expose API fields
     api_fields = []
+
+
+def sections_for(pages) -> Dict[int, Optional[SectionPage]]:
+    """
+    {page id: its SectionPage ancestor} for a list of pages, in one query.
+    """
+    paths = {p.pk: ancestor_paths(p) for p in pages}
+    wanted = {path for ancestors in paths.values() for path in ancestors}
+    sections = {s.path: s for s in SectionPage.objects.filter(path__in=wanted)}
+    return {
+        pk: next((sections[path] for path in reversed(ancestors) if path in sections), None)
+        for pk, ancestors in paths.items()
+    }
@@ -0,0 +1,149 @@
+"""
+Asynchronous, batched search index updates.
+
+Models with `search_auto_update = False` are not indexed by Wagtail when
+they are saved. Instead, `enqueue()` records "this object changed" in the
+SearchIndexQueueItem table (one row per object, so ten saves of the same
+draft are one pending update), and `process_batch()` later indexes the
+pending objects in bulk, one `add_bulk()` call per model and backend.
+
+When indexing a model fails its rows stay queued, but are pushed back with
+an exponential backoff (SEARCH_QUEUE_RETRY_DELAY doubling up to
+SEARCH_QUEUE_MAX_RETRY_DELAY), so a batch that keeps failing does not hold
+up everything queued after it. Saving the object again resets the backoff.
+
+Run the worker with:
+
+    python manage.py process_search_queue
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from wagtail.search.backends import get_search_backends
+
+from .models import SearchIndexQueueItem
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+RETRY_DELAY = getattr(settings, "SEARCH_QUEUE_RETRY_DELAY", 30)
+MAX_RETRY_DELAY = getattr(settings, "SEARCH_QUEUE_MAX_RETRY_DELAY", 60 * 60)
+
+
+def enqueue(model, pk) -> None:
+    """
+    Queue an object for (re)indexing. Cheap enough to call on every save.
+    """
+    content_type = ContentType.objects.get_for_model(model)
+    SearchIndexQueueItem.objects.bulk_create(
+        [SearchIndexQueueItem(content_type=content_type, object_id=str(pk), queued_at=timezone.now())],
+        update_conflicts=True,
+        unique_fields=["content_type", "object_id"],
+        update_fields=["queued_at", "attempts"],
+    )
+
+
+def post_save_handler(sender, instance, **kwargs):
+    if kwargs.get("raw", False):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: enqueue(sender, pk))
+
+
+def post_delete_handler(sender, instance, **kwargs):
+    # The worker notices the object is gone and removes it from the index.
+    # (Django clears instance.pk after the delete, so read it now.)
+    pk = instance.pk
+    transaction.on_commit(lambda: enqueue(sender, pk))
+
+
+def register_signal_handlers():
+    from django.db.models.signals import post_delete, post_save
+    from wagtail.search.index import get_indexed_models
+
+    for model in get_indexed_models():
+        if getattr(model, "search_auto_update", True):
+            continue
+        post_save.connect(post_save_handler, sender=model)
+        post_delete.connect(post_delete_handler, sender=model)
+
+
+def _index_model(model, object_ids: List[str]) -> None:
+    indexed = list(model.get_indexed_objects().filter(pk__in=object_ids))
+    found = {str(obj.pk) for obj in indexed}
+    missing = [pk for pk in object_ids if pk not in found]
+
+    for backend in get_search_backends(with_auto_update=True):
+        if indexed:
+            backend.add_bulk(model, indexed)
+        for pk in missing:
+            # deleted (or no longer indexable): an unsaved stub carries enough to delete by pk
+            backend.delete(model(pk=pk))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    How long to wait before retrying a row that has failed `attempts` times.
+    """
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def _postpone(pks: List[int], claimed_at) -> None:
+    failed = defaultdict(list)
+    rows = SearchIndexQueueItem.objects.filter(pk__in=pks, queued_at__lte=claimed_at)
+    for pk, attempts in rows.values_list("pk", "attempts"):
+        failed[attempts + 1].append(pk)
+    for attempts, group in failed.items():
+        # re-saved objects have a newer queued_at and are left alone
+        SearchIndexQueueItem.objects.filter(pk__in=group, queued_at__lte=claimed_at).update(
+            attempts=attempts, queued_at=claimed_at + retry_delay(attempts)
+        )
+
+
+def process_batch(batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Index up to `batch_size` queued objects. Returns how many were indexed.
+    """
+    claimed_at = timezone.now()
+    items = list(
+        SearchIndexQueueItem.objects.filter(queued_at__lte=claimed_at)
+        .order_by("queued_at")
+        .values_list("pk", "content_type_id", "object_id")[:batch_size]
+    )
+    if not items:
+        return 0
+
+    by_content_type: Dict[int, List[str]] = defaultdict(list)
+    for _pk, content_type_id, object_id in items:
+        by_content_type[content_type_id].append(object_id)
+
+    for content_type_id, object_ids in by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        try:
+            _index_model(model, object_ids)
+        except Exception:
+            # leave the rows queued; they are retried after a backoff
+            logger.exception("Indexing %d %s objects failed", len(object_ids), model.__name__)
+            by_content_type[content_type_id] = []
+
+    done = [pk for pk, content_type_id, _ in items if by_content_type[content_type_id]]
+    failed = [pk for pk, content_type_id, _ in items if not by_content_type[content_type_id]]
+    if failed:
+        _postpone(failed, claimed_at)
+
+    # Objects saved again while we were indexing have a newer queued_at and stay queued.
+    SearchIndexQueueItem.objects.filter(pk__in=done, queued_at__lte=claimed_at).delete()
+    return len(done)
@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import UploadSession
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ["filename", "status", "received", "total_size", "duplicate", "created_by", "updated_at"]
+    list_filter = ["status", "duplicate"]
+    raw_id_fields = ["image", "created_by"]
+    readonly_fields = ["file_hash"]
@@ -5,3 +5,5 @@ class MediaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.media"
 
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,92 @@
+"""
+Compute perceptual hashes for images that don't have a current one.
+
+    python manage.py backfill_image_fingerprints --workers 8
+
+Decoding and shrinking images is CPU-bound, so chunks of images are hashed
+in worker processes; the results are written back in bulk from this
+process, so the workers never write to the database.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from typing import List, Tuple
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import F, Q
+
+from wagtail.images import get_image_model
+
+from apps.media.models import ImageFingerprint
+from apps.media.similarity import bump_version, dhash_file, to_signed
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+Result = Tuple[int, int, str]  # (image id, signed dhash, file hash)
+
+
+def _fingerprint_chunk(pks: List[int]) -> Tuple[List[Result], int]:
+    results, failed = [], 0
+    for image in get_image_model().objects.filter(pk__in=pks).only("pk", "file", "file_hash"):
+        try:
+            with image.open_file() as f:
+                results.append((image.pk, to_signed(dhash_file(f)), image.file_hash))
+        except Exception:
+            failed += 1
+    return results, failed
+
+
+class Command(BaseCommand):
+    help = "Compute missing or stale perceptual hashes for Wagtail images, across processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--all", action="store_true", help="Recompute hashes that look current too.")
+
+    def handle(self, *args, **opts):
+        images = get_image_model().objects.all()
+        if not opts["all"]:
+            images = images.filter(
+                Q(fingerprint__isnull=True) | ~Q(fingerprint__file_hash=F("file_hash"))
+            )
+        pks = list(images.order_by("pk").values_list("pk", flat=True))
+        size = opts["chunk_size"]
+        chunks = [pks[start:start + size] for start in range(0, len(pks), size)]
+
+        workers = max(1, min(opts["workers"], len(chunks)))
+        self.stdout.write(f"{len(pks)} images in {len(chunks)} chunks across {workers} worker(s)")
+
+        started = time.perf_counter()
+        if workers == 1:
+            results = map(_fingerprint_chunk, chunks)
+            self._store(results)
+        else:
+            # see parallel_update_index: forked workers must not share our connection
+            connections.close_all()
+            ctx = multiprocessing.get_context("fork")
+            with ctx.Pool(workers, initializer=connections.close_all) as pool:
+                self._store(pool.imap_unordered(_fingerprint_chunk, chunks))
+
+        if self.stored:
+            bump_version()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"hashed {self.stored} images in {elapsed:.1f}s ({self.failed} unreadable)")
+
+    def _store(self, results) -> None:
+        self.stored = self.failed = 0
+        for rows, failed in results:
+            ImageFingerprint.objects.bulk_create(
+                [ImageFingerprint(image_id=pk, dhash=value, file_hash=file_hash) for pk, value, file_hash in rows],
+                update_conflicts=True,
+                unique_fields=["image"],
+                update_fields=["dhash", "file_hash", "updated_at"],
+            )
+            self.stored += len(rows)
+            self.failed += failed
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.media.uploads import SESSION_TTL, clean_stale_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned chunked uploads and their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=int, default=SESSION_TTL,
+            help="Seconds since the last chunk (default: MEDIA_UPLOAD_SESSION_TTL).",
+        )
+
+    def handle(self, *args, **opts):
+        count = clean_stale_uploads(opts["older_than"])
+        self.stdout.write(f"removed {count} uploads")
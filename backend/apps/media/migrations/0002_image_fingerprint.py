@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0001_initial'),
+        ('wagtailimages', '0027_image_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageFingerprint',
+            fields=[
+                ('image', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='wagtailimages.image')),
+                ('dhash', models.BigIntegerField()),
+                ('file_hash', models.CharField(blank=True, max_length=40)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+    ]
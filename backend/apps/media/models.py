@@ -1,3 +1,77 @@
+from __future__ import annotations
+
+import uuid
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked image upload (apps/media/uploads.py).
+
+    `received` is how many bytes of the file are safely on disk, so a client
+    that lost its connection asks for it and carries on from there. Once the
+    last chunk arrives the file becomes (or is matched to) a Wagtail Image.
+    """
+    UPLOADING = "uploading"
+    COMPLETE = "complete"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (UPLOADING, "Uploading"),
+        (COMPLETE, "Complete"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    title = models.CharField(max_length=255, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=UPLOADING)
+
+    # SHA-1, the same digest Wagtail stores in Image.file_hash
+    file_hash = models.CharField(max_length=40, blank=True)
+    image = models.ForeignKey(
+        "wagtailimages.Image", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    duplicate = models.BooleanField(default=False)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # cleanup of abandoned uploads
+            models.Index(fields=["status", "updated_at"], name="upload_status_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.total_size})"
+
+    @property
+    def is_complete(self) -> bool:
+        return self.received >= self.total_size
+
+
+class ImageFingerprint(models.Model):
+    """
+    Perceptual hash (64-bit dHash) of a Wagtail image, used to find crops
+    and recompressed copies of the same photo (apps/media/similarity.py).
+
+    Stored signed because databases have no unsigned 64-bit integer;
+    `file_hash` records which file it was computed from, so re-saving an
+    image without replacing the file does not hash it again.
+    """
+    image = models.OneToOneField(
+        "wagtailimages.Image", on_delete=models.CASCADE, primary_key=True, related_name="fingerprint"
+    )
+    dhash = models.BigIntegerField()
+    file_hash = models.CharField(max_length=40, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.image_id}: {self.dhash & 0xFFFFFFFFFFFFFFFF:016x}"
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from wagtail.images import get_image_model
+
+from .similarity import forget, update_fingerprint
+
+
+Image = get_image_model()
+
+
+@receiver(post_save, sender=Image)
+def fingerprint_saved_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: update_fingerprint(instance))
+
+
+@receiver(post_delete, sender=Image)
+def forget_deleted_image(sender, instance, **kwargs):
+    forget(instance.pk)
@@ -0,0 +1,252 @@
+"""
+Near-duplicate search over the image library.
+
+Every image gets a 64-bit difference hash (dHash): the picture is shrunk to
+9x8 greyscale and each bit says whether a pixel is brighter than its right
+neighbour. Crops, resizes and recompressions of the same photo end up a few
+bits apart, so "similar" means a small Hamming distance.
+
+Scanning every hash is too slow for a large library, so each worker keeps a
+multi-index hash in memory: the 64 bits are split into four 16-bit bands,
+each with its own dict of band value -> image ids. Two hashes within distance
+r must agree to within r // 4 bits on at least one band (pigeonhole), so a
+search only looks up the few band values that close to the query's and
+checks the exact distance of those candidates.
+
+The index is filled from ImageFingerprint on first use. Saving a fingerprint
+bumps a version key in the cache; workers that see a new version fetch the
+rows changed since their last sync rather than reloading everything.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import timedelta
+from itertools import combinations
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from PIL import Image as PILImage
+
+from .models import ImageFingerprint
+
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "media:similarity:version"
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+DEFAULT_DISTANCE = 10
+MAX_DISTANCE = 12
+
+# fingerprints committed slightly out of order must not be missed by a sync
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+def dhash(image: PILImage.Image) -> int:
+    # JPEGs can be decoded at a fraction of their size, which is all we need
+    image.draft("L", (64, 64))
+    small = image.convert("L").resize((9, 8), PILImage.Resampling.LANCZOS)
+    pixels = small.tobytes()
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def dhash_file(f) -> int:
+    with PILImage.open(f) as image:
+        return dhash(image)
+
+
+def to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+def _bands(value: int) -> List[int]:
+    return [(value >> (i * BAND_BITS)) & BAND_MASK for i in range(BANDS)]
+
+
+def _neighbours(band: int, flips: int):
+    # every value within `flips` bits of `band`
+    for n in range(flips + 1):
+        for bits in combinations(range(BAND_BITS), n):
+            value = band
+            for bit in bits:
+                value ^= 1 << bit
+            yield value
+
+
+class SimilarityIndex:
+    """
+    Multi-index hash of unsigned 64-bit dHashes, keyed by image id.
+    """
+    def __init__(self):
+        self._hashes: Dict[int, int] = {}
+        self._tables: List[Dict[int, Set[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, image_id: int, value: int) -> None:
+        old = self._hashes.get(image_id)
+        if old == value:
+            return
+        if old is not None:
+            self.remove(image_id)
+
+        self._hashes[image_id] = value
+        for table, band in zip(self._tables, _bands(value)):
+            table.setdefault(band, set()).add(image_id)
+
+    def remove(self, image_id: int) -> None:
+        value = self._hashes.pop(image_id, None)
+        if value is None:
+            return
+        for table, band in zip(self._tables, _bands(value)):
+            ids = table.get(band)
+            if ids is not None:
+                ids.discard(image_id)
+                if not ids:
+                    del table[band]
+
+    def get(self, image_id: int) -> Optional[int]:
+        return self._hashes.get(image_id)
+
+    def search(self, value: int, distance: int = DEFAULT_DISTANCE) -> List[Tuple[int, int]]:
+        """
+        (distance, image id) of every hash within `distance` bits, closest first.
+        """
+        distance = max(0, min(distance, MAX_DISTANCE))
+        flips = distance // BANDS
+
+        candidates: Set[int] = set()
+        for table, band in zip(self._tables, _bands(value)):
+            for neighbour in _neighbours(band, flips):
+                ids = table.get(neighbour)
+                if ids:
+                    candidates |= ids
+
+        matches = []
+        for image_id in candidates:
+            d = (self._hashes[image_id] ^ value).bit_count()
+            if d <= distance:
+                matches.append((d, image_id))
+        matches.sort()
+        return matches
+
+
+_index = SimilarityIndex()
+_lock = threading.Lock()
+_synced_version: Optional[int] = None
+_synced_at = None
+
+
+def _version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def bump_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def get_index() -> SimilarityIndex:
+    """
+    This worker's index, brought up to date with ImageFingerprint if it changed.
+    """
+    global _synced_version, _synced_at
+
+    version = _version()
+    if version == _synced_version:
+        return _index
+
+    with _lock:
+        if version == _synced_version:
+            return _index
+
+        started = timezone.now()
+        rows = ImageFingerprint.objects.all()
+        if _synced_at is not None:
+            rows = rows.filter(updated_at__gte=_synced_at - SYNC_OVERLAP)
+
+        for image_id, value in rows.values_list("image_id", "dhash").iterator(chunk_size=5000):
+            _index.add(image_id, to_unsigned(value))
+
+        _synced_version, _synced_at = version, started
+    return _index
+
+
+def reset_index() -> None:
+    global _index, _synced_version, _synced_at
+    with _lock:
+        _index, _synced_version, _synced_at = SimilarityIndex(), None, None
+
+
+def forget(image_id: int) -> None:
+    # Deletions are not picked up by syncs; callers filter results through
+    # the database anyway, this just keeps the local index tidy.
+    with _lock:
+        _index.remove(image_id)
+
+
+def parse_distance(value: str) -> int:
+    """
+    A ?distance= query value, clamped to what the index searches (0..MAX_DISTANCE bits).
+    """
+    return min(int(value), MAX_DISTANCE) if value.isdigit() else DEFAULT_DISTANCE
+
+
+def similar_images(image_id: int, distance: int = DEFAULT_DISTANCE) -> List[Tuple[int, int]]:
+    """
+    (distance, image id) of images that look like `image_id`, closest first, excluding itself.
+    """
+    index = get_index()
+    value = index.get(image_id)
+    if value is None:
+        row = ImageFingerprint.objects.filter(image_id=image_id).values_list("dhash", flat=True).first()
+        if row is None:
+            return []
+        value = to_unsigned(row)
+    return [(d, pk) for d, pk in index.search(value, distance) if pk != image_id]
+
+
+def update_fingerprint(image, force: bool = False) -> Optional[ImageFingerprint]:
+    """
+    Compute and store the dHash of a Wagtail image, unless it is current.
+    """
+    current = ImageFingerprint.objects.filter(image_id=image.pk).first()
+    if current and not force and image.file_hash and current.file_hash == image.file_hash:
+        return current
+
+    try:
+        with image.open_file() as f:
+            value = dhash_file(f)
+    except Exception:
+        logger.warning("could not fingerprint image %s", image.pk, exc_info=True)
+        return None
+
+    fingerprint, _ = ImageFingerprint.objects.update_or_create(
+        image_id=image.pk, defaults={"dhash": to_signed(value), "file_hash": image.file_hash}
+    )
+    bump_version()
+    return fingerprint
@@ -1,3 +1,283 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import random
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from PIL import Image as PILImage
+from wagtail.images.models import Image
+
+from . import similarity, uploads
+from .models import ImageFingerprint, UploadSession
+from .wagtail_hooks import show_similar_images
+
+
+def png_bytes(color="red", size=(64, 48)) -> bytes:
+    buf = io.BytesIO()
+    PILImage.new("RGB", size, color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def photo_bytes(seed: int, fmt="PNG", quality=95, crop=0) -> bytes:
+    # a blocky random "photo", so different seeds have unrelated structure
+    rnd = random.Random(seed)
+    grid = PILImage.new("L", (9, 8))
+    grid.putdata([rnd.randrange(256) for _ in range(72)])
+    image = grid.resize((360, 320), PILImage.Resampling.BILINEAR).convert("RGB")
+    if crop:
+        image = image.crop((crop, crop, 360 - crop, 320 - crop))
+
+    buf = io.BytesIO()
+    image.save(buf, fmt, **({"quality": quality} if fmt == "JPEG" else {}))
+    return buf.getvalue()
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+        media = override_settings(MEDIA_ROOT=os.path.join(self.tmp, "media"))
+        media.enable()
+        self.addCleanup(media.disable)
+
+        patcher = mock.patch.object(uploads, "TEMP_DIR", os.path.join(self.tmp, "parts"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(uploads._hashers.clear)
+
+        self.photographer = get_user_model().objects.create_superuser("photo", password="pw")
+        self.client.force_login(self.photographer)
+
+    def start(self, data: bytes, filename="wire.png"):
+        response = self.client.post(
+            reverse("media-uploads"), {"filename": filename, "size": len(data)}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()["id"]
+
+    def put(self, upload_id, offset, chunk):
+        return self.client.put(
+            reverse("media-upload-detail", args=[upload_id]),
+            chunk,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def upload(self, data: bytes, chunk_size=100):
+        upload_id = self.start(data)
+        for offset in range(0, len(data), chunk_size):
+            response = self.put(upload_id, offset, data[offset:offset + chunk_size])
+        return response
+
+    def test_chunks_become_an_image_hashed_like_wagtail(self):
+        data = png_bytes()
+        response = self.upload(data)
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body["status"], "complete")
+        self.assertFalse(body["duplicate"])
+
+        image = Image.objects.get(pk=body["image"]["id"])
+        self.assertEqual((image.width, image.height), (64, 48))
+        self.assertEqual(image.file_hash, hashlib.sha1(data).hexdigest())
+        self.assertEqual(image.file_size, len(data))
+        self.assertEqual(image.uploaded_by_user, self.photographer)
+        self.assertEqual(os.listdir(uploads.TEMP_DIR), [])
+
+    def test_identical_file_reuses_existing_image(self):
+        data = png_bytes()
+        first = self.upload(data).json()
+        second = self.upload(data, chunk_size=37).json()
+
+        self.assertTrue(second["duplicate"])
+        self.assertEqual(second["image"]["id"], first["image"]["id"])
+        self.assertEqual(Image.objects.count(), 1)
+
+        other = self.upload(png_bytes("blue")).json()
+        self.assertFalse(other["duplicate"])
+        self.assertEqual(Image.objects.count(), 2)
+
+    def test_resume_on_another_worker(self):
+        data = png_bytes()
+        upload_id = self.start(data)
+        self.assertEqual(self.put(upload_id, 0, data[:50]).json()["offset"], 50)
+
+        # out-of-order chunk is refused and the client is told where to resume
+        response = self.put(upload_id, 80, data[80:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], 50)
+
+        # another worker has no running hasher: it is rebuilt from the partial file
+        uploads._hashers.clear()
+        self.assertEqual(self.client.get(reverse("media-upload-detail", args=[upload_id])).json()["offset"], 50)
+        body = self.put(upload_id, 50, data[50:]).json()
+
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).file_hash, hashlib.sha1(data).hexdigest())
+        self.assertEqual(Image.objects.get(pk=body["image"]["id"]).file_hash, hashlib.sha1(data).hexdigest())
+
+    def test_rejects_files_that_are_not_images(self):
+        response = self.client.post(
+            reverse("media-uploads"), {"filename": "notes.txt", "size": 10}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        data = b"not really a png"
+        upload_id = self.start(data)
+        response = self.put(upload_id, 0, data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).status, UploadSession.FAILED)
+        self.assertFalse(Image.objects.exists())
+        self.assertEqual(os.listdir(uploads.TEMP_DIR), [])
+
+    def test_runs_wagtail_image_validation(self):
+        # JPEG bytes behind a .png name
+        upload_id = self.start(photo_bytes(1, fmt="JPEG"), filename="wire.png")
+        response = self.put(upload_id, 0, photo_bytes(1, fmt="JPEG"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("does not match the file format", response.json()["detail"])
+
+        with override_settings(WAGTAILIMAGES_MAX_IMAGE_PIXELS=64 * 47):
+            response = self.upload(png_bytes())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("too many pixels", response.json()["detail"])
+
+        with override_settings(WAGTAILIMAGES_MAX_UPLOAD_SIZE=10):
+            response = self.client.post(
+                reverse("media-uploads"), {"filename": "a.png", "size": 11}, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 413)
+
+        self.assertFalse(Image.objects.exists())
+        self.assertEqual(set(UploadSession.objects.values_list("status", flat=True)), {UploadSession.FAILED})
+
+    def test_unexpected_error_marks_the_upload_failed(self):
+        data = png_bytes()
+        upload_id = self.start(data)
+        with mock.patch.object(Image, "save", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError), self.assertLogs(uploads.logger, "ERROR"):
+                self.put(upload_id, 0, data)
+
+        session = UploadSession.objects.get(pk=upload_id)
+        self.assertEqual((session.status, session.received), (UploadSession.FAILED, len(data)))
+        self.assertIsNone(session.image)
+        self.assertEqual(os.listdir(uploads.TEMP_DIR), [])
+        self.assertEqual(os.listdir(os.path.join(self.tmp, "media", "original_images")), [])
+
+    def test_requires_image_permission(self):
+        self.client.force_login(get_user_model().objects.create_user("reader", password="pw"))
+        response = self.client.post(
+            reverse("media-uploads"), {"filename": "a.png", "size": 10}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_clean_stale_uploads(self):
+        upload_id = self.start(png_bytes())
+        UploadSession.objects.filter(pk=upload_id).update(updated_at="2000-01-01T00:00:00Z")
+
+        self.assertEqual(uploads.clean_stale_uploads(), 1)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(uploads.TEMP_DIR), [])
+
+
+class SimilarImageTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+        media = override_settings(MEDIA_ROOT=self.tmp)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        cache.clear()
+        similarity.reset_index()
+        self.addCleanup(similarity.reset_index)
+
+        self.editor = get_user_model().objects.create_superuser("editor", password="pw")
+        self.client.force_login(self.editor)
+
+    def make_image(self, title, data, ext="png"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Image.objects.create(title=title, file=ImageFile(io.BytesIO(data), name=f"{title}.{ext}"))
+
+    def test_index_search_matches_brute_force(self):
+        rnd = random.Random(7)
+        index = similarity.SimilarityIndex()
+        hashes = {}
+        base = rnd.getrandbits(64)
+        for pk in range(1, 2001):
+            # half of them are a few bits away from `base`
+            value = rnd.getrandbits(64) if pk % 2 else base ^ sum(1 << rnd.randrange(64) for _ in range(rnd.randrange(14)))
+            hashes[pk] = value
+            index.add(pk, value)
+
+        for distance in (0, 3, 7, 10, 12):
+            expected = sorted(((v ^ base).bit_count(), pk) for pk, v in hashes.items() if (v ^ base).bit_count() <= distance)
+            self.assertEqual(index.search(base, distance), expected)
+
+        index.remove(2)
+        self.assertNotIn(2, [pk for _, pk in index.search(hashes[2], 0)])
+
+    def test_recompressed_crop_is_similar(self):
+        original = self.make_image("original", photo_bytes(1))
+        copy = self.make_image("copy", photo_bytes(1, fmt="JPEG", quality=40, crop=8), ext="jpg")
+        other = self.make_image("other", photo_bytes(2))
+
+        self.assertEqual(ImageFingerprint.objects.count(), 3)
+        self.assertEqual([pk for _, pk in similarity.similar_images(original.pk)], [copy.pk])
+
+        request = RequestFactory().get("/", {"similar_to": original.pk})
+        chosen = show_similar_images(Image.objects.all(), request)
+        self.assertEqual(list(chosen), [copy])
+
+        response = self.client.get(reverse("media-similar-images", args=[original.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["id"] for r in response.json()["results"]], [copy.pk])
+        self.assertNotIn(other.pk, [r["id"] for r in response.json()["results"]])
+
+    def test_edit_view_links_to_similar_images(self):
+        original = self.make_image("original", photo_bytes(1))
+        copy = self.make_image("copy", photo_bytes(1, fmt="JPEG", quality=40, crop=8), ext="jpg")
+        self.make_image("other", photo_bytes(2))
+
+        similar_url = reverse("media_similar_images", args=[original.pk])
+        self.assertContains(self.client.get(reverse("wagtailimages:edit", args=[original.pk])), similar_url)
+
+        response = self.client.get(similar_url)
+        self.assertEqual([image for _, image in response.context["matches"]], [copy])
+        self.assertContains(response, reverse("wagtailimages:edit", args=[copy.pk]))
+
+        # far-out distances are clamped to what the index searches
+        self.assertEqual(self.client.get(similar_url, {"distance": 64}).context["distance"], similarity.MAX_DISTANCE)
+        response = self.client.get(reverse("media-similar-images", args=[original.pk]), {"distance": 999})
+        self.assertEqual(response.json()["distance"], similarity.MAX_DISTANCE)
+
+    def test_other_workers_pick_up_new_fingerprints(self):
+        original = self.make_image("original", photo_bytes(3))
+        self.assertEqual(similarity.similar_images(original.pk), [])
+
+        copy = self.make_image("copy", photo_bytes(3, fmt="JPEG", quality=50), ext="jpg")
+        self.assertEqual([pk for _, pk in similarity.similar_images(original.pk)], [copy.pk])
+
+    def test_backfill_command(self):
+        images = [self.make_image(f"img{seed}", photo_bytes(seed)) for seed in range(4)]
+        ImageFingerprint.objects.all().delete()
+
+        out = io.StringIO()
+        call_command("backfill_image_fingerprints", workers=1, chunk_size=3, stdout=out)
+
+        self.assertIn("hashed 4 images", out.getvalue())
+        self.assertEqual(
+            sorted(ImageFingerprint.objects.values_list("image_id", flat=True)), [i.pk for i in images]
+        )
@@ -0,0 +1,300 @@
+"""
+Resumable chunked image uploads with content-hash deduplication.
+
+A client opens an UploadSession with the file name and size, then sends the
+file in order as raw chunks, each tagged with the offset it starts at. Chunks
+are streamed straight to a partial file in MEDIA_UPLOAD_TEMP_DIR, 64KB at a
+time, and fed to a SHA-1 hasher on the way, so neither the file nor a chunk
+is ever held in memory and the digest is ready when the last byte lands.
+
+The digest is the one Wagtail keeps in `Image.file_hash` (indexed), so when
+the same wire photo was uploaded before, the session is pointed at that
+Image and the partial file is thrown away: no second original, no second set
+of renditions. Otherwise the file goes through the same validation as the
+Wagtail image upload form (WagtailImageField: format against extension,
+WAGTAILIMAGES_MAX_UPLOAD_SIZE, WAGTAILIMAGES_MAX_IMAGE_PIXELS) before it
+becomes an Image.
+
+Hashers live in the worker that received the previous chunk. When a chunk
+lands on another worker (or after a restart) the hasher is rebuilt from the
+partial file, which costs one sequential read of what is already there.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import timedelta
+from typing import BinaryIO, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.utils import timezone
+
+from wagtail.images import get_image_model
+from wagtail.images.fields import WagtailImageField
+from wagtail.images.utils import get_allowed_image_extensions
+
+from .models import UploadSession
+
+
+logger = logging.getLogger(__name__)
+
+TEMP_DIR = str(getattr(settings, "MEDIA_UPLOAD_TEMP_DIR", os.path.join(settings.MEDIA_ROOT, "upload_parts")))
+MAX_UPLOAD_SIZE = getattr(settings, "MEDIA_UPLOAD_MAX_SIZE", 50 * 1024 * 1024)
+SESSION_TTL = getattr(settings, "MEDIA_UPLOAD_SESSION_TTL", 24 * 60 * 60)
+
+READ_SIZE = 64 * 1024
+LOCK_TIMEOUT = 5 * 60
+MAX_HASHERS = 256
+
+
+class UploadError(Exception):
+    """
+    The request cannot be applied to the session; `status` is the HTTP status to answer with.
+    """
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+class _PartFile(File):
+    """
+    The partial file, presented to WagtailImageField like an upload Django
+    spooled to disk, so it is validated in place rather than read into memory.
+    """
+    def __init__(self, file, name: str, path: str):
+        super().__init__(file, name)
+        self._path = path
+
+    def temporary_file_path(self) -> str:
+        return self._path
+
+
+class _Hashers:
+    """
+    Running SHA-1 per upload in this worker, keyed by session id and tagged
+    with the offset it has consumed up to. Bounded, oldest dropped first.
+    """
+    def __init__(self, size: int = MAX_HASHERS):
+        self._size = size
+        self._guard = threading.Lock()
+        self._items: "OrderedDict[uuid.UUID, Tuple[int, object]]" = OrderedDict()
+
+    def take(self, session_id: uuid.UUID, offset: int):
+        with self._guard:
+            item = self._items.pop(session_id, None)
+        if item is not None and item[0] == offset:
+            return item[1]
+        return None
+
+    def put(self, session_id: uuid.UUID, offset: int, hasher) -> None:
+        with self._guard:
+            self._items[session_id] = (offset, hasher)
+            self._items.move_to_end(session_id)
+            while len(self._items) > self._size:
+                self._items.popitem(last=False)
+
+    def discard(self, session_id: uuid.UUID) -> None:
+        with self._guard:
+            self._items.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._guard:
+            self._items.clear()
+
+
+_hashers = _Hashers()
+
+
+def part_path(session: UploadSession) -> str:
+    return os.path.join(TEMP_DIR, f"{session.id}.part")
+
+
+def _lock_key(session: UploadSession) -> str:
+    return f"media:upload:{session.id}:lock"
+
+
+def _rehash(path: str, length: int):
+    hasher = hashlib.sha1()  # noqa: S324 - matches Wagtail's Image.file_hash
+    with open(path, "rb") as f:
+        remaining = length
+        while remaining:
+            data = f.read(min(READ_SIZE, remaining))
+            if not data:
+                raise UploadError("Partial upload is missing data, start again.", status=409)
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def start_upload(user, filename: str, total_size: int, title: str = "") -> UploadSession:
+    filename = os.path.basename(filename or "")
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension not in get_allowed_image_extensions():
+        raise UploadError(f"Unsupported file type: {filename or '(no name)'}.")
+    if total_size <= 0:
+        raise UploadError("size must be a positive number of bytes.")
+    max_size = _max_size()
+    if total_size > max_size:
+        raise UploadError(f"File is larger than {max_size} bytes.", status=413)
+
+    session = UploadSession.objects.create(
+        filename=filename,
+        title=title[:255],
+        total_size=total_size,
+        created_by=user if user and user.is_authenticated else None,
+    )
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    open(part_path(session), "wb").close()
+    return session
+
+
+def _max_size() -> int:
+    # read per call, like WagtailImageField does, so override_settings applies
+    wagtail_max = getattr(settings, "WAGTAILIMAGES_MAX_UPLOAD_SIZE", 10 * 1024 * 1024)
+    return MAX_UPLOAD_SIZE if wagtail_max is None else min(MAX_UPLOAD_SIZE, wagtail_max)
+
+
+def write_chunk(session: UploadSession, offset: int, stream: BinaryIO, length: int) -> UploadSession:
+    """
+    Append `length` bytes from `stream` at `offset`, which must be where the
+    previous chunk ended. Completes the upload when the last byte arrives.
+    """
+    token = uuid.uuid4().hex
+    if not cache.add(_lock_key(session), token, LOCK_TIMEOUT):
+        raise UploadError("Another chunk of this upload is being written.", status=409)
+
+    try:
+        # the row may have moved on while this request waited for its body
+        session.refresh_from_db(fields=["received", "status"])
+        if session.status != UploadSession.UPLOADING:
+            raise UploadError("Upload is already finished.", status=409)
+        if offset != session.received:
+            raise UploadError(f"Expected offset {session.received}.", status=409)
+        if length <= 0 or offset + length > session.total_size:
+            raise UploadError("Chunk does not fit the declared file size.")
+
+        path = part_path(session)
+        if not os.path.exists(path):
+            raise UploadError("Partial upload is gone, start again.", status=410)
+
+        hasher = _hashers.take(session.id, offset) or _rehash(path, offset)
+        written = 0
+        with open(path, "r+b") as f:
+            # drop whatever a failed earlier chunk left past the last known offset
+            f.seek(offset)
+            f.truncate()
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break  # client went away; keep what arrived so it can resume
+                f.write(data)
+                hasher.update(data)
+                written += len(data)
+
+        session.received = offset + written
+        UploadSession.objects.filter(pk=session.pk).update(
+            received=session.received, updated_at=timezone.now()
+        )
+        _hashers.put(session.id, session.received, hasher)
+
+        if session.is_complete:
+            _finish(session, hasher.hexdigest())
+        return session
+    finally:
+        if cache.get(_lock_key(session)) == token:
+            cache.delete(_lock_key(session))
+
+
+def _finish(session: UploadSession, file_hash: str) -> None:
+    _hashers.discard(session.id)
+    path = part_path(session)
+    session.file_hash = file_hash
+
+    fields = ["file_hash", "image", "duplicate", "status", "updated_at"]
+
+    existing = get_image_model().objects.filter(file_hash=file_hash).order_by("pk").first()
+    if existing is not None:
+        session.image, session.duplicate = existing, True
+        logger.info("upload %s is a duplicate of image %s", session.id, existing.pk)
+    else:
+        try:
+            session.image = _create_image(session, path)
+        except Exception as exc:
+            # whatever went wrong, the session must not stay UPLOADING with
+            # every byte received: no further chunk could ever finish it
+            if not isinstance(exc, UploadError):
+                logger.exception("upload %s could not be turned into an image", session.id)
+            session.image = None
+            session.status = UploadSession.FAILED
+            session.save(update_fields=fields)
+            _remove(path)
+            raise
+
+    session.status = UploadSession.COMPLETE
+    session.save(update_fields=fields)
+    _remove(path)
+
+
+def _validate(session: UploadSession, path: str) -> None:
+    with open(path, "rb") as f:
+        try:
+            WagtailImageField().clean(_PartFile(f, session.filename, path))
+        except ValidationError as exc:
+            status = 413 if exc.code == "file_too_large" else 400
+            raise UploadError(" ".join(exc.messages), status=status)
+
+
+def _create_image(session: UploadSession, path: str):
+    _validate(session, path)
+
+    ImageModel = get_image_model()
+    image = ImageModel(
+        title=session.title or os.path.splitext(session.filename)[0],
+        uploaded_by_user=session.created_by,
+        file_size=session.total_size,
+        # already known, so Wagtail does not read the file again to hash it
+        file_hash=session.file_hash,
+    )
+    with open(path, "rb") as f:
+        image.file.save(session.filename, File(f), save=False)
+    try:
+        image.save()
+    except Exception:
+        image.file.delete(save=False)
+        raise
+    return image
+
+
+def abort_upload(session: UploadSession) -> None:
+    _hashers.discard(session.id)
+    _remove(part_path(session))
+    session.delete()
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def clean_stale_uploads(ttl: Optional[int] = None) -> int:
+    """
+    Delete unfinished uploads not touched for `ttl` seconds, with their partial files.
+    """
+    cutoff = timezone.now() - timedelta(seconds=SESSION_TTL if ttl is None else ttl)
+    stale = UploadSession.objects.exclude(status=UploadSession.COMPLETE).filter(updated_at__lt=cutoff)
+
+    count = 0
+    for session in stale.iterator():
+        abort_upload(session)
+        count += 1
+    return count
@@ -1,3 +1,31 @@
-from django.shortcuts import render
+from __future__ import annotations
 
-# Create your views here.
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+
+from wagtail.images import get_image_model
+from wagtail.permissions import policy_registry
+
+from .similarity import MAX_DISTANCE, parse_distance, similar_images
+
+
+def similar_images_view(request, image_id):
+    """
+    Admin page listing near-duplicates of an image; linked from the image edit view.
+    """
+    policy = policy_registry.get_by_type(get_image_model())
+    visible = policy.instances_user_has_any_permission_for(request.user, ["change", "choose"])
+    image = get_object_or_404(visible, pk=image_id)
+
+    distance = parse_distance(request.GET.get("distance", ""))
+    matches = similar_images(image.pk, distance)
+    images = visible.in_bulk([pk for _, pk in matches])
+
+    return TemplateResponse(request, "media/admin/similar_images.html", {
+        "image": image,
+        "distance": distance,
+        "max_distance": MAX_DISTANCE,
+        "matches": [(d, images[pk]) for d, pk in matches if pk in images],
+        "page_title": f"Images similar to {image.title}",
+        "header_icon": "image",
+    })
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from django.urls import path
+
+from wagtail import hooks
+
+from .similarity import parse_distance, similar_images
+from .views import similar_images_view
+
+
+@hooks.register("register_admin_urls")
+def register_similar_images_url():
+    # linked from the image edit view (templates/wagtailimages/images/edit.html)
+    return [
+        path("media/images/<int:image_id>/similar/", similar_images_view, name="media_similar_images"),
+    ]
+
+
+@hooks.register("construct_image_chooser_queryset")
+def show_similar_images(images, request):
+    """
+    ?similar_to=<image id>[&distance=<bits>] narrows the chooser to near-duplicates of that image.
+    """
+    similar_to = request.GET.get("similar_to", "")
+    if not similar_to.isdigit():
+        return images
+
+    distance = parse_distance(request.GET.get("distance", ""))
+    return images.filter(pk__in=[pk for _, pk in similar_images(int(similar_to), distance)])
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from .models import Subscriber
+
+
+@admin.register(Subscriber)
+class SubscriberAdmin(admin.ModelAdmin):
+    list_display = ["email", "is_active", "created_at", "confirmed_at", "unsubscribed_at"]
+    list_filter = ["is_active"]
+    search_fields = ["email"]
+    filter_horizontal = ["sections", "tags"]
+    readonly_fields = ["token"]
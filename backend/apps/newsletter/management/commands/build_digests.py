@@ -0,0 +1,120 @@
+"""
+Build the daily newsletter digest for every active subscriber.
+
+    python manage.py build_digests --workers 8 --outbox tmp/outbox/digest.mbox
+    python manage.py build_digests --format files --outbox tmp/outbox/2026-10-19/
+
+Blocks are rendered once in this process (apps/newsletter/digest.py);
+worker processes only assemble messages. Batches are written to the outbox
+in subscriber order as they complete, with at most a few batches per worker
+in flight, so memory stays flat however many subscribers there are.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.newsletter import digest
+from apps.newsletter.digest import FILES, MBOX
+
+
+DEFAULT_BATCH_SIZE = 500
+IN_FLIGHT_PER_WORKER = 4
+
+
+def _when(value: str) -> datetime:
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Not a date/time: {value}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = "Assemble per-subscriber newsletter digests into a local outbox (mbox or .eml files)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=_when, help="Start of the period (default: --until minus 24 hours).")
+        parser.add_argument("--until", type=_when, help="End of the period (default: now).")
+        parser.add_argument("--format", choices=[MBOX, FILES], default=MBOX)
+        parser.add_argument("--outbox", type=Path, help="mbox file or directory to write to.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--stories", type=int, default=digest.STORIES_PER_BLOCK, help="Stories per block.")
+
+    def handle(self, *args, **opts):
+        until = opts["until"] or timezone.now()
+        since = opts["since"] or until - timedelta(hours=24)
+        outbox_path = opts["outbox"] or self.default_outbox(until, opts["format"])
+
+        started = time.perf_counter()
+        prepared = digest.make_digest(since, until, opts["format"], opts["stories"])
+        if digest.TOP not in prepared.blocks:
+            self.stdout.write("no new articles: nothing to send")
+            return
+        self.stdout.write(
+            f"{len(prepared.blocks)} blocks rendered in {time.perf_counter() - started:.2f}s"
+        )
+
+        outbox = digest.open_outbox(outbox_path, opts["format"])
+        digest.set_digest(prepared)
+        try:
+            sent, written = self.assemble(prepared, outbox, opts["workers"], opts["batch_size"])
+        finally:
+            digest.set_digest(None)
+            outbox.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{sent} digests ({written / 1e6:.1f} MB) written to {outbox_path} in {elapsed:.1f}s: "
+            f"{sent / elapsed if elapsed else 0:.0f} messages/s"
+        )
+
+    def assemble(self, prepared: digest.Digest, outbox, workers: int, batch_size: int):
+        sent = written = 0
+
+        def batches():
+            for chunk in digest.recipients(prepared.blocks):
+                for start in range(0, len(chunk), batch_size):
+                    yield chunk[start:start + batch_size]
+
+        if workers <= 1:
+            for batch in batches():
+                written += outbox.write(digest.assemble(batch))
+                sent += len(batch)
+            return sent, written
+
+        # Workers inherit the digest (and the loaded app registry) by forking;
+        # they never touch the database, but must not share the parent's
+        # connection either.
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(workers, initializer=connections.close_all) as pool:
+            pending = deque()
+            for batch in batches():
+                pending.append((len(batch), pool.apply_async(digest.assemble, (batch,))))
+                # keep order, and keep at most a few batches per worker queued
+                while pending and (len(pending) >= workers * IN_FLIGHT_PER_WORKER or pending[0][1].ready()):
+                    size, result = pending.popleft()
+                    written += outbox.write(result.get())
+                    sent += size
+            while pending:
+                size, result = pending.popleft()
+                written += outbox.write(result.get())
+                sent += size
+        return sent, written
+
+    def default_outbox(self, until: datetime, outbox_format: str) -> Path:
+        base = Path(getattr(settings, "NEWSLETTER_OUTBOX_DIR", settings.BASE_DIR / "tmp" / "outbox"))
+        name = f"digest-{timezone.localtime(until):%Y-%m-%d}"
+        return base / (f"{name}.mbox" if outbox_format == MBOX else name)
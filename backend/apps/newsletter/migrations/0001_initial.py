@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:02
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('content', '0004_archive_day_count'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subscriber',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('unsubscribed_at', models.DateTimeField(blank=True, null=True)),
+                ('sections', models.ManyToManyField(blank=True, related_name='+', to='content.sectionpage')),
+                ('tags', models.ManyToManyField(blank=True, related_name='+', to='taggit.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_active', 'id'], name='subscriber_active_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:18
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def confirm_existing_subscribers(apps, schema_editor):
+    # signed up before double opt-in existed
+    Subscriber = apps.get_model("newsletter", "Subscriber")
+    Subscriber.objects.filter(is_active=True).update(confirmed_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsletter', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriber',
+            name='confirmed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(confirm_existing_subscribers, migrations.RunPython.noop),
+    ]
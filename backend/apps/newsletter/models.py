@@ -0,0 +1,33 @@
+import uuid
+
+from django.db import models
+
+
+class Subscriber(models.Model):
+    """
+    An email address signed up for the daily digest (NewsletterCard).
+
+    Sections and tags are the reader's preferences; a digest has the top
+    stories plus a block for each preferred section or tag that has new
+    articles. `token` identifies the subscriber in unsubscribe links.
+
+    Rows are only created or changed from a confirmed opt-in link
+    (apps/newsletter/optin.py).
+    """
+    email = models.EmailField(unique=True)
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    sections = models.ManyToManyField("content.SectionPage", blank=True, related_name="+")
+    tags = models.ManyToManyField("taggit.Tag", blank=True, related_name="+")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    unsubscribed_at = models.DateTimeField(null=True, blank=True)
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the digest run walks active subscribers in pk order
+            models.Index(fields=["is_active", "id"], name="subscriber_active_idx"),
+        ]
+
+    def __str__(self):
+        return self.email
@@ -0,0 +1,104 @@
+"""
+Double opt-in for the newsletter.
+
+A subscribe request changes nothing: it mails the address a confirmation
+link carrying the requested preferences in a signed token. Only a POST
+with that token creates the Subscriber, reactivates one that opted out or
+replaces its sections and tags. Nobody can sign someone else up, or undo
+their unsubscribe, without access to their inbox.
+
+Tokens expire after NEWSLETTER_CONFIRM_MAX_AGE seconds. A token issued
+before the subscriber's latest unsubscribe is refused, so an old link
+cannot undo it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.mail import send_mail
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from taggit.models import Tag
+
+from apps.content.models import SectionPage
+
+from .models import Subscriber
+
+
+CONFIRM_MAX_AGE = getattr(settings, "NEWSLETTER_CONFIRM_MAX_AGE", 3 * 24 * 60 * 60)
+SALT = "newsletter.optin"
+
+
+@dataclass
+class Pending:
+    email: str
+    section_ids: List[int]
+    tag_ids: List[int]
+    issued_at: datetime
+
+
+def make_token(email: str, sections: List[SectionPage], tags: List[Tag]) -> str:
+    return signing.dumps(
+        {"email": email, "sections": [s.pk for s in sections], "tags": [t.pk for t in tags],
+         "at": timezone.now().timestamp()},
+        salt=SALT, compress=True,
+    )
+
+
+def read_token(token: str) -> Optional[Pending]:
+    try:
+        data = signing.loads(token, salt=SALT, max_age=CONFIRM_MAX_AGE)
+    except signing.BadSignature:  # also expired
+        return None
+    return Pending(
+        email=data["email"], section_ids=data["sections"], tag_ids=data["tags"],
+        issued_at=datetime.fromtimestamp(data["at"], tz=timezone.get_current_timezone()),
+    )
+
+
+def confirm_url(token: str) -> str:
+    # the frontend page shows the preferences and POSTs the token back to
+    # /api/v1/newsletter/confirm/<token>/
+    frontend = getattr(settings, "PUBLIC_FRONTEND_BASE_URL", "").rstrip("/")
+    return f"{frontend}/newsletter/confirm/{token}"
+
+
+def send_confirmation(email: str, sections: List[SectionPage], tags: List[Tag]) -> None:
+    context = {
+        "site": getattr(settings, "WAGTAIL_SITE_NAME", ""),
+        "url": confirm_url(make_token(email, sections, tags)),
+        "sections": [s.title for s in sections],
+        "tags": [t.name for t in tags],
+    }
+    send_mail(
+        subject=f"Confirm your {context['site']} newsletter subscription",
+        message=render_to_string("newsletter/confirm.txt", context),
+        from_email=getattr(settings, "NEWSLETTER_FROM_EMAIL", None),
+        recipient_list=[email],
+    )
+
+
+def confirm(pending: Pending) -> Optional[Subscriber]:
+    """
+    Apply a confirmed request. None if the token predates an unsubscribe.
+    """
+    with transaction.atomic():
+        subscriber, _ = Subscriber.objects.select_for_update().get_or_create(email=pending.email)
+        if subscriber.unsubscribed_at and subscriber.unsubscribed_at > pending.issued_at:
+            return None
+
+        now = timezone.now()
+        subscriber.is_active, subscriber.unsubscribed_at = True, None
+        subscriber.confirmed_at = now
+        subscriber.save(update_fields=["is_active", "unsubscribed_at", "confirmed_at"])
+        # sections or tags deleted since the request simply drop out
+        subscriber.sections.set(SectionPage.objects.filter(pk__in=pending.section_ids))
+        subscriber.tags.set(Tag.objects.filter(pk__in=pending.tag_ids))
+    return subscriber
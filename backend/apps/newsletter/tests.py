@@ -0,0 +1,173 @@
+import email
+import mailbox
+import re
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from taggit.models import Tag
+
+from apps.content import fixtures
+
+from . import digest
+from .models import Subscriber
+
+
+def build_site(test):
+    test.home, [test.politics, test.sports] = fixtures.build_site("politics", "sports")
+    test.budget = Tag.objects.create(name="Budget", slug="budget")
+
+    now = timezone.now()
+    budget = fixtures.add_article(test.politics, "budget-passed", first_published_at=now)
+    fixtures.add_article(test.politics, "from-the-floor", first_published_at=now - timedelta(minutes=1),
+                        excerpt="x " * 800)
+    fixtures.add_article(test.sports, "cup-final", first_published_at=now - timedelta(minutes=2))
+    budget.tags.add(test.budget)
+    budget.save()
+
+
+class DigestTests(TestCase):
+    def setUp(self):
+        build_site(self)
+        self.until = timezone.now() + timedelta(minutes=1)
+        self.since = self.until - timedelta(hours=24)
+
+    def test_blocks_are_built_once_per_section_and_tag(self):
+        blocks = digest.build_blocks(self.since, self.until)
+        self.assertEqual(
+            list(blocks),
+            [digest.TOP, digest.section_block_key(self.politics.pk),
+             digest.section_block_key(self.sports.pk), digest.tag_block_key(self.budget.pk)],
+        )
+        self.assertIn(b"Cup final", blocks[digest.TOP].text)
+        self.assertNotIn(b"Cup final", blocks[digest.section_block_key(self.politics.pk)].html)
+        self.assertTrue(all(len(line) < 998 for b in blocks.values() for line in b.html.splitlines()))
+
+        self.assertEqual(digest.build_blocks(self.until, self.until + timedelta(hours=1)), {})
+
+    def test_recipients_get_top_stories_and_their_preferences(self):
+        blocks = digest.build_blocks(self.since, self.until)
+        reader = Subscriber.objects.create(email="reader@example.com")
+        reader.sections.set([self.sports])
+        reader.tags.set([self.budget])
+        Subscriber.objects.create(email="casual@example.com")
+        Subscriber.objects.create(email="gone@example.com", is_active=False)
+
+        with self.assertNumQueries(4):  # subscribers, sections, tags, and the empty next chunk
+            chunks = list(digest.recipients(blocks, chunk_size=10))
+        [batch] = chunks
+        self.assertEqual(
+            [(e, keys) for e, _, keys in batch],
+            [
+                ("reader@example.com", (digest.TOP, digest.section_block_key(self.sports.pk),
+                                        digest.tag_block_key(self.budget.pk))),
+                ("casual@example.com", (digest.TOP,)),
+            ],
+        )
+
+    def test_rendered_message_is_valid_mime(self):
+        prepared = digest.make_digest(self.since, self.until, digest.FILES)
+        subscriber = Subscriber.objects.create(email="reader@example.com")
+        [recipient] = next(digest.recipients(prepared.blocks))
+
+        message = email.message_from_bytes(prepared.render(recipient))
+        self.assertEqual(message["To"], "reader@example.com")
+        self.assertIn(str(subscriber.token), message["List-Unsubscribe"])
+        text, html = message.get_payload()
+        self.assertEqual(text.get_content_type(), "text/plain")
+        self.assertIn("Budget passed", text.get_payload(decode=True).decode())
+        self.assertIn("/article/cup-final", html.get_payload(decode=True).decode())
+
+
+class SubscribeAPITests(TestCase):
+    def setUp(self):
+        build_site(self)
+
+    def request_link(self, email, **preferences):
+        mail.outbox.clear()
+        response = self.client.post(reverse("newsletter-subscribe"), {"email": email, **preferences},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 202)
+        [message] = mail.outbox
+        self.assertEqual(message.to, [email.lower()])
+        token = re.search(r"/newsletter/confirm/(\S+)", message.body).group(1)
+        return reverse("newsletter-confirm", args=[token])
+
+    def test_subscribe_update_and_unsubscribe(self):
+        confirm = self.request_link("Reader@Example.com", sections=["politics"])
+        self.assertFalse(Subscriber.objects.exists())
+
+        self.assertEqual(self.client.get(confirm).json(),
+                         {"email": "reader@example.com", "sections": ["politics"], "tags": []})
+        response = self.client.post(confirm)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"email": "reader@example.com", "subscribed": True,
+                                           "sections": ["politics"], "tags": []})
+
+        confirm = self.request_link("reader@example.com", tags="budget")
+        self.assertEqual(Subscriber.objects.get().sections.count(), 1)
+        response = self.client.post(confirm)
+        self.assertEqual(response.json()["tags"], ["budget"])
+        self.assertEqual(response.json()["sections"], [])
+
+        subscriber = Subscriber.objects.get()
+        self.assertIsNotNone(subscriber.confirmed_at)
+        unsubscribe = reverse("newsletter-unsubscribe", args=[subscriber.token])
+        self.client.post(unsubscribe, {"List-Unsubscribe": "One-Click"})
+        subscriber.refresh_from_db()
+        self.assertFalse(subscriber.is_active)
+        self.assertIsNotNone(subscriber.unsubscribed_at)
+
+    def test_opted_out_address_is_not_changed_without_confirmation(self):
+        old_link = self.request_link("reader@example.com", sections=["politics"])
+        subscriber = Subscriber.objects.create(email="reader@example.com", is_active=False,
+                                               unsubscribed_at=timezone.now())
+        subscriber.sections.set([self.sports])
+
+        self.request_link("reader@example.com", sections=["politics"])
+        subscriber.refresh_from_db()
+        self.assertFalse(subscriber.is_active)
+        self.assertEqual(list(subscriber.sections.all()), [self.sports])
+
+        # a link from before the unsubscribe can't undo it
+        self.assertEqual(self.client.post(old_link).status_code, 404)
+        self.assertEqual(self.client.post(reverse("newsletter-confirm", args=["forged:token"])).status_code, 404)
+        subscriber.refresh_from_db()
+        self.assertFalse(subscriber.is_active)
+
+    def test_invalid_input(self):
+        url = reverse("newsletter-subscribe")
+        self.assertEqual(self.client.post(url, {"email": "nope"}).status_code, 400)
+        response = self.client.post(url, {"email": "a@example.com", "sections": ["nope"]},
+                                    content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Subscriber.objects.exists())
+        self.assertEqual(mail.outbox, [])
+
+
+class BuildDigestsCommandTests(TestCase):
+    def setUp(self):
+        build_site(self)
+        for i in range(7):
+            Subscriber.objects.create(email=f"reader{i}@example.com")
+
+    def test_pool_streams_every_digest_to_an_mbox(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "digest.mbox"
+            out = StringIO()
+            call_command("build_digests", outbox=path, workers=2, batch_size=2, stdout=out)
+
+            self.assertIn("7 digests", out.getvalue())
+            self.assertIn("messages/s", out.getvalue())
+            box = mailbox.mbox(path)
+            self.assertEqual(sorted(m["To"] for m in box), [f"reader{i}@example.com" for i in range(7)])
+            # "From the floor" starts a line and must be escaped in an mbox
+            self.assertIn(b">From the floor", path.read_bytes())
+            self.assertIn("From the floor", box[0].get_payload()[0].get_payload())
@@ -1,3 +1,14 @@
 from django.contrib import admin
 
-# Register your models here.
+from treebeard.admin import TreeAdmin
+from treebeard.forms import movenodeform_factory
+
+from .models import Topic
+
+
+@admin.register(Topic)
+class TopicAdmin(TreeAdmin):
+    form = movenodeform_factory(Topic)
+    list_display = ["name", "slug"]
+    search_fields = ["name", "slug"]
+    prepopulated_fields = {"slug": ["name"]}
@@ -1,3 +1,78 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from django.core.cache import cache
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from treebeard.mp_tree import MP_Node
+
+
+# Breadcrumbs of every topic depend on the names/slugs of its ancestors, so
+# any change to the tree bumps one generation number instead of trying to
+# find every affected key.
+GENERATION_KEY = "taxonomy:generation"
+ANCESTORS_TIMEOUT = 60 * 60
+
+
+class Topic(MP_Node):
+    """
+    A node in the topic hierarchy, e.g. Politics -> Elections -> Provincial.
+
+    Stored as a materialized path (treebeard MP_Node, the same structure
+    Wagtail uses for pages): every topic's `path` starts with its parent's,
+    so "this topic and all subtopics" is a single `path__startswith` lookup
+    on an indexed column.
+    """
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    description = models.TextField(blank=True)
+
+    node_order_by = ["name"]
+
+    class Meta:
+        ordering = ["path"]
+
+    def __str__(self):
+        return self.name
+
+    def subtree_filter(self, prefix: str = "") -> Dict[str, str]:
+        """
+        Lookup matching this topic and its descendants, e.g.
+        ArticlePage.objects.filter(**topic.subtree_filter("topics__")).
+        """
+        return {f"{prefix}path__startswith": self.path}
+
+    def breadcrumbs(self) -> List[dict]:
+        """
+        Ancestors from the root down to this topic (inclusive), cached.
+        """
+        key = f"taxonomy:ancestors:{_generation()}:{self.path}"
+        crumbs = cache.get(key)
+        if crumbs is None:
+            # every ancestor's path is a prefix of ours: one query, no tree walk
+            prefixes = [self.path[:i] for i in range(self.steplen, len(self.path) + 1, self.steplen)]
+            crumbs = list(
+                Topic.objects.filter(path__in=prefixes).order_by("path").values("name", "slug")
+            )
+            cache.set(key, crumbs, ANCESTORS_TIMEOUT)
+        return crumbs
+
+
+def _generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = 1
+        cache.add(GENERATION_KEY, generation, None)
+    return generation
+
 
-# Create your models here.
+@receiver(post_save, sender=Topic)
+@receiver(post_delete, sender=Topic)
+def bump_topic_generation(**kwargs):
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
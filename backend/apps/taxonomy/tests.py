@@ -1,3 +1,61 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from apps.content.fixtures import build_site
+from apps.content.models import ArticlePage
+
+from .models import Topic
+
+
+class TopicTreeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.politics = Topic.add_root(name="Politics", slug="politics")
+        self.elections = self.politics.add_child(name="Elections", slug="elections")
+        self.provincial = self.elections.add_child(name="Provincial", slug="provincial")
+        self.sports = Topic.add_root(name="Sports", slug="sports")
+
+        _, [section] = build_site("news")
+
+        self.articles = {}
+        for slug, topics in [
+            ("koshi-results", [self.provincial]),
+            ("poll-dates", [self.elections, self.provincial]),
+            ("cabinet", [self.politics]),
+            ("cricket", [self.sports]),
+        ]:
+            article = ArticlePage(title=slug, slug=slug)
+            article.topics.set(topics)
+            self.articles[slug] = section.add_child(instance=article)
+
+    def feed_slugs(self, topic_slug):
+        response = self.client.get(reverse("topic-feed", args=[topic_slug]))
+        return sorted(card["slug"] for card in response.json()["results"])
+
+    def test_subtree_query_includes_subtopics_once(self):
+        qs = ArticlePage.objects.filter(**self.elections.subtree_filter("topics__")).distinct()
+        self.assertEqual(sorted(a.slug for a in qs), ["koshi-results", "poll-dates"])
+
+    def test_topic_feed(self):
+        self.assertEqual(self.feed_slugs("politics"), ["cabinet", "koshi-results", "poll-dates"])
+        self.assertEqual(self.feed_slugs("provincial"), ["koshi-results", "poll-dates"])
+        self.assertEqual(self.feed_slugs("sports"), ["cricket"])
+
+    def test_topic_feed_metadata(self):
+        data = self.client.get(reverse("topic-feed", args=["elections"])).json()
+        self.assertEqual([c["slug"] for c in data["topic"]["breadcrumbs"]], ["politics", "elections"])
+        self.assertEqual(data["topic"]["children"], [{"name": "Provincial", "slug": "provincial"}])
+
+    def test_unknown_topic(self):
+        self.assertEqual(self.client.get(reverse("topic-feed", args=["nope"])).status_code, 404)
+
+    def test_breadcrumbs_are_cached_and_invalidated(self):
+        self.assertEqual([c["name"] for c in self.provincial.breadcrumbs()], ["Politics", "Elections", "Provincial"])
+        with self.assertNumQueries(0):
+            self.provincial.breadcrumbs()
+
+        self.politics.name = "Politics & Government"
+        self.politics.save()
+
+        self.assertEqual(self.provincial.breadcrumbs()[0]["name"], "Politics & Government")
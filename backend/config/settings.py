@@ -37,6 +37,8 @@ INSTALLED_APPS = [
     "apps.media",
     "apps.analytics",
     "apps.content",
+    "apps.ads",
+    "apps.newsletter",
     "apps.api",
     "apps.newsroom_admin",
 
@@ -54,6 +56,7 @@ INSTALLED_APPS = [
 
     "modelcluster",
     "taggit",
+    "treebeard",
 ]
 
 MIDDLEWARE = [
@@ -100,6 +103,48 @@ DATABASES = {
 }
 
 
+# Cache
+# Single-flight API payload caching lives in apps/api/cache.py.
+# Point this at a shared backend (Redis/Memcached) in production so the
+# cross-process rebuild lock is shared between workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+API_CACHE_TIMEOUT = 60
+API_CACHE_STALE_GRACE = 30
+
+# Per-worker LRU of rendered article responses in front of the shared cache
+# (apps/api/hot.py). Other workers see a publish within the TTL; 0 disables.
+API_HOT_CACHE_SIZE = 256
+API_HOT_CACHE_TTL = 5
+
+# Scheduled publishing (apps/api/scheduler.py, `manage.py run_scheduler`):
+# articles are pre-built this many seconds before they go live.
+SCHEDULER_LEAD_TIME = 30
+SCHEDULER_POLL_INTERVAL = 10
+SCHEDULER_WARM_RENDITIONS = []
+
+# CDN: responses carry Surrogate-Key headers (apps/api/cdn.py); on publish
+# only the affected keys are purged (apps/api/purge.py). Leave the URL empty
+# to disable purging.
+API_CDN_MAX_AGE = 30
+API_CDN_S_MAXAGE = 300
+CDN_PURGE_URL = ""
+CDN_PURGE_TOKEN = ""
+CDN_PURGE_DEBOUNCE = 0.5
+
+# "For You" feeds (apps/accounts/feed.py): inbox length per reader, and the
+# follow count above which a reader is merged on read instead of fanned out to.
+# The fan-out runs on the django_tasks backend in TASKS (immediate by default;
+# configure a queue-backed backend and its worker in production).
+FEED_INBOX_CAP = 500
+FEED_FANOUT_MAX_FOLLOWS = 200
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -164,8 +209,28 @@ SPECTACULAR_SETTINGS = {
 WAGTAIL_SITE_NAME = "The Nepal Wire"
 WAGTAILADMIN_BASE_URL = "http://localhost:8000"
 PUBLIC_BACKEND_BASE_URL = "http://localhost:8000"
+PUBLIC_FRONTEND_BASE_URL = "http://localhost:3000"
 
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Chunked image uploads (apps/media/uploads.py). Partial files live outside
+# MEDIA_ROOT until they are complete; the directory must be shared by all
+# workers that can receive chunks of the same upload.
+MEDIA_UPLOAD_TEMP_DIR = BASE_DIR / "tmp" / "uploads"
+MEDIA_UPLOAD_MAX_SIZE = 50 * 1024 * 1024
+MEDIA_UPLOAD_SESSION_TTL = 24 * 60 * 60
+
+# Newsletter digests (apps/newsletter/digest.py, `manage.py build_digests`).
+NEWSLETTER_FROM_EMAIL = "The Nepal Wire <newsletter@localhost>"
+NEWSLETTER_STORIES_PER_BLOCK = 5
+NEWSLETTER_OUTBOX_DIR = BASE_DIR / "tmp" / "outbox"
+# Subscribing is double opt-in: confirmation links (apps/newsletter/optin.py)
+# are mailed straight away and expire after this many seconds.
+NEWSLETTER_CONFIRM_MAX_AGE = 3 * 24 * 60 * 60
+
+# Confirmation emails are printed in development; point this at an SMTP
+# server (EMAIL_HOST etc.) in production.
+EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
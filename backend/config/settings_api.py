@@ -0,0 +1,68 @@
+"""
+API-only worker profile.
+
+Loads just what apps.api needs to serve /api/v1/: no Django/Wagtail admin,
+messages, drf_spectacular, forms/redirects or the placeholder apps.
+Sessions stay so signed-in readers can use /api/v1/me/. Used by the autoscaled API pods, where cold-start time matters:
+
+    DJANGO_SETTINGS_MODULE=config.settings_api gunicorn config.wsgi_api
+
+Run `python manage.py startup_report --compare config.settings config.settings_api`
+to see boot time and RSS for both profiles.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+
+INSTALLED_APPS = [
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+
+    "rest_framework",
+    "corsheaders",
+
+    "apps.accounts",
+    "apps.taxonomy",
+    "apps.content",
+    "apps.ads",
+    "apps.newsletter",
+    "apps.media",
+    "apps.api",
+
+    # wagtail.images without its admin wiring, see LeanImagesConfig
+    "apps.api.apps.LeanImagesConfig",
+    "wagtail",
+
+    "modelcluster",
+    "taggit",
+]
+
+MIDDLEWARE = [
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+]
+
+ROOT_URLCONF = "config.urls_api"
+
+WSGI_APPLICATION = "config.wsgi_api.application"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {"context_processors": []},
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.openapi.AutoSchema",
+    "DEFAULT_FILTER_BACKENDS": [],
+    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
+    "DEFAULT_AUTHENTICATION_CLASSES": ["rest_framework.authentication.SessionAuthentication"],
+}
@@ -0,0 +1,10 @@
+"""
+URLconf for the API-only profile (config.settings_api).
+"""
+
+from django.urls import path, include
+
+urlpatterns = [
+    # Custom DRF endpoints: /api/v1/...
+    path("api/v1/", include("apps.api.urls")),
+]
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for API-only workers (see config/settings_api.py).
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings_api')
+
+application = get_wsgi_application()